@@ -0,0 +1,252 @@
+"""Bulk ingestion of a directory or glob of PDFs with a resumable manifest.
+
+Usage:
+    python batch_ingest.py path/to/pdfs --workers 4
+    python batch_ingest.py "reports/**/*.pdf" --manifest ingest_manifest.db
+    python batch_ingest.py --status
+
+Every document's state and per-stage timings are recorded in a SQLite
+manifest. Documents already marked done with an unchanged content hash are
+skipped, and documents left "running" by a crash are picked up again on the
+next run (re-ingestion is idempotent, so partial writes are safe to redo).
+
+Only partitioning runs in worker processes: with --workers above 1 the
+workers fill the parse cache, then this process runs the full pipeline one
+document at a time against the cached partitions. Chroma's persistent client
+does not support writes from several processes, so the vector stores (and
+the embedding model) are only ever touched here.
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional
+
+from nodes.parse_cache import file_sha256, parse_cache_enabled
+
+# Compiled once per process
+_workflow = None
+
+
+def connect_manifest(manifest_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(manifest_path, timeout=30)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS documents (
+            path TEXT PRIMARY KEY,
+            sha256 TEXT,
+            status TEXT,
+            pages INTEGER,
+            seconds REAL,
+            error TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stages (
+            path TEXT,
+            stage TEXT,
+            seconds REAL,
+            PRIMARY KEY (path, stage)
+        )
+    ''')
+    return conn
+
+
+def find_documents(target: str) -> List[str]:
+    """All PDFs under a directory, or the files matched by a glob pattern"""
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "**", "*.pdf")
+    else:
+        pattern = target
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+
+def select_pending(conn: sqlite3.Connection, paths: List[str], retry_failed: bool) -> List[Dict[str, str]]:
+    """Documents that still need work, with their current content hash"""
+    # A document still marked running was interrupted by a crash
+    conn.execute("UPDATE documents SET status = 'pending' WHERE status = 'running'")
+    conn.commit()
+
+    pending = []
+    for path in paths:
+        sha256 = file_sha256(path)
+        row = conn.execute("SELECT sha256, status FROM documents WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == sha256 and (row[1] == "done" or (row[1] == "failed" and not retry_failed)):
+            continue
+        pending.append({"path": path, "sha256": sha256})
+    return pending
+
+
+def parse_one(document_path: str, window_pages: Optional[int] = None) -> Dict[str, Any]:
+    """Partition a document in a worker so the serial pipeline run hits the parse cache"""
+    from nodes.page_windows import count_pages, split_page_windows
+    from nodes.parsing_document_node import partition_document_cached
+
+    start = time.perf_counter()
+    try:
+        if window_pages:
+            # Same page ranges as process_document_streaming, so the cache keys match
+            for window in split_page_windows(0, count_pages(document_path), window_pages):
+                partition_document_cached(document_path, tuple(window))
+        else:
+            partition_document_cached(document_path)
+        error = None
+    except Exception as e:
+        error = str(e)
+    return {"path": document_path, "error": error, "seconds": time.perf_counter() - start}
+
+
+def prefetch_partitions(pending: List[Dict[str, str]], workers: int,
+                        window_pages: Optional[int]) -> Dict[str, float]:
+    """Parse pending documents in parallel; returns parse seconds per document"""
+    print(f"⚡ Partitioning {len(pending)} documents across {workers} worker processes")
+    seconds = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_one, doc["path"], window_pages) for doc in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            seconds[result["path"]] = result["seconds"]
+            if result["error"]:
+                # The serial run parses it again and records the failure
+                print(f"⚠️ Parsing {result['path']} failed in a worker: {result['error']}")
+    return seconds
+
+
+def ingest_one(document_path: str, window_pages: Optional[int] = None) -> Dict[str, Any]:
+    """Run the pipeline for one document and return only a small summary"""
+    global _workflow
+    from orchestration.workflows import create_document_processing_workflow
+    from utilse import create_initial_state, process_document_streaming
+
+    start = time.perf_counter()
+    try:
+        if window_pages:
+            result = process_document_streaming(document_path, window_pages)
+        else:
+            if _workflow is None:
+                _workflow = create_document_processing_workflow()
+            result = _workflow.invoke(create_initial_state(document_path))
+        report = result.get("ingestion_report", [])
+        errors = [status for status in result.get("storage_status", []) if "error" in status.lower()]
+        if result.get("processing_status") == "streamed_with_errors" and not errors:
+            errors = ["one or more page windows failed"]
+        return {
+            "path": document_path,
+            "ok": not errors,
+            "error": "; ".join(errors) or None,
+            "pages": next((r.get("pages", 0) for r in report if r.get("stage") == "parse"), 0),
+            "stages": {r["node"]: r["seconds"] for r in report if r.get("stage") == "timing"},
+            "seconds": time.perf_counter() - start,
+        }
+    except Exception as e:
+        return {
+            "path": document_path,
+            "ok": False,
+            "error": str(e),
+            "pages": 0,
+            "stages": {},
+            "seconds": time.perf_counter() - start,
+        }
+
+
+def record_result(conn: sqlite3.Connection, result: Dict[str, Any]):
+    conn.execute('''
+        UPDATE documents SET status = ?, pages = ?, seconds = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE path = ?
+    ''', ("done" if result["ok"] else "failed", result["pages"], result["seconds"], result["error"], result["path"]))
+    conn.executemany(
+        "INSERT OR REPLACE INTO stages (path, stage, seconds) VALUES (?, ?, ?)",
+        [(result["path"], stage, seconds) for stage, seconds in result["stages"].items()]
+    )
+    conn.commit()
+
+
+def print_status(conn: sqlite3.Connection):
+    print("📋 Manifest status:")
+    for status, count, pages in conn.execute(
+        "SELECT status, COUNT(*), COALESCE(SUM(pages), 0) FROM documents GROUP BY status ORDER BY status"
+    ):
+        print(f"   {status}: {count} documents, {pages} pages")
+
+
+def run_batch(target: str, manifest_path: str, workers: int, retry_failed: bool = False,
+              limit: Optional[int] = None, window_pages: Optional[int] = None):
+    conn = connect_manifest(manifest_path)
+    paths = find_documents(target)
+    pending = select_pending(conn, paths, retry_failed)[:limit]
+    print(f"📦 Found {len(paths)} PDFs, {len(paths) - len(pending)} already done, {len(pending)} to ingest")
+    if not pending:
+        return
+
+    conn.executemany('''
+        INSERT INTO documents (path, sha256, status) VALUES (?, ?, 'running')
+        ON CONFLICT(path) DO UPDATE SET sha256 = excluded.sha256, status = 'running', error = NULL
+    ''', [(doc["path"], doc["sha256"]) for doc in pending])
+    conn.commit()
+
+    start = time.perf_counter()
+    done = failed = pages = 0
+    stage_totals: Dict[str, float] = {}
+
+    if workers > 1 and not parse_cache_enabled:
+        print("⚠️ --workers needs the parse cache (PARSE_CACHE=1), ingesting with a single process")
+    elif workers > 1:
+        parse_seconds = prefetch_partitions(pending, workers, window_pages)
+        stage_totals["parallel_parse"] = sum(parse_seconds.values())
+
+    # Vector store writes stay in this process, one document at a time
+    for doc in pending:
+        result = ingest_one(doc["path"], window_pages)
+        record_result(conn, result)
+
+        if result["ok"]:
+            done += 1
+            pages += result["pages"]
+        else:
+            failed += 1
+            print(f"❌ {result['path']}: {result['error']}")
+        for stage, seconds in result["stages"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + seconds
+
+        minutes = max(time.perf_counter() - start, 1e-6) / 60
+        print(
+            f"✅ {done + failed}/{len(pending)} "
+            f"({done / minutes:.1f} docs/min, {pages / minutes:.1f} pages/min)"
+        )
+
+    minutes = max(time.perf_counter() - start, 1e-6) / 60
+    print(f"\n🎉 Batch finished in {minutes:.1f} min: {done} done, {failed} failed")
+    print(f"   Throughput: {done / minutes:.1f} docs/min, {pages / minutes:.1f} pages/min")
+    if stage_totals:
+        print(f"\n⏱️ Time per stage (summed over documents):")
+        for stage, seconds in sorted(stage_totals.items(), key=lambda item: -item[1]):
+            print(f"   {stage}: {seconds:.1f}s ({seconds / max(done + failed, 1):.1f}s/doc)")
+    conn.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Ingest a directory or glob of PDFs, parsing in parallel")
+    parser.add_argument("target", nargs="?", help="Directory (searched recursively) or glob pattern")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for the parallel parse phase (vector writes always run serially)")
+    parser.add_argument("--manifest", default="ingest_manifest.db", help="SQLite manifest path")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run documents that failed before")
+    parser.add_argument("--limit", type=int, default=None, help="Ingest at most this many documents")
+    parser.add_argument("--window-pages", type=int, default=None,
+                        help="Stream each document in page windows of this size to bound memory")
+    parser.add_argument("--status", action="store_true", help="Print manifest status and exit")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        print_status(connect_manifest(args.manifest))
+        return
+    if not args.target:
+        parser.error("target is required unless --status is given")
+
+    run_batch(args.target, args.manifest, args.workers, args.retry_failed, args.limit, args.window_pages)
+
+
+if __name__ == "__main__":
+    main()
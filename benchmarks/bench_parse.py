@@ -0,0 +1,62 @@
+"""Compare the legacy two-pass hi_res parse with the current single-pass parse.
+
+Usage: python -m benchmarks.bench_parse path/to/document.pdf
+"""
+import sys
+import time
+from unstructured.partition.pdf import partition_pdf
+from unstructured.documents.elements import CompositeElement
+from nodes.parsing_document_node import (
+    partition_document, chunk_elements, PARTITION_KWARGS, CHUNKING_KWARGS
+)
+
+
+def two_pass_parse(document_path: str):
+    """The original parse: one hi_res run for elements and a second one for chunks"""
+    raw_chunks = partition_pdf(filename=document_path, chunking_strategy=None, **PARTITION_KWARGS)
+    text_chunks = partition_pdf(
+        filename=document_path,
+        strategy="hi_res",
+        chunking_strategy="by_title",
+        **CHUNKING_KWARGS
+    )
+    return raw_chunks, text_chunks
+
+
+def single_pass_parse(document_path: str):
+    """The current parse (honours PARSE_STRATEGY/PARSE_WORKERS), chunks derived from its elements"""
+    raw_chunks, _ = partition_document(document_path)
+    return raw_chunks, chunk_elements(raw_chunks)
+
+
+def composite_texts(chunks):
+    """The part of the chunk list that extract_text_node actually consumes"""
+    return [chunk.text for chunk in chunks if isinstance(chunk, CompositeElement)]
+
+
+def main(document_path: str):
+    print(f"📄 Benchmarking parse of {document_path}")
+
+    start = time.perf_counter()
+    legacy_raw, legacy_chunks = two_pass_parse(document_path)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    raw, chunks = single_pass_parse(document_path)
+    single_seconds = time.perf_counter() - start
+
+    print(f"   Two-pass:    {legacy_seconds:.1f}s ({len(legacy_raw)} elements, {len(legacy_chunks)} chunks)")
+    print(f"   Single-pass: {single_seconds:.1f}s ({len(raw)} elements, {len(chunks)} chunks)")
+    print(f"   Speedup:     {legacy_seconds / single_seconds:.2f}x")
+
+    legacy_texts = composite_texts(legacy_chunks)
+    texts = composite_texts(chunks)
+    matching = sum(1 for a, b in zip(legacy_texts, texts) if a == b)
+    print(f"   Text chunks identical: {matching}/{max(len(legacy_texts), len(texts))}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    main(sys.argv[1])
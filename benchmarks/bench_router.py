@@ -0,0 +1,111 @@
+"""Measure the embedding router: accuracy, fast-path coverage and latency.
+
+Usage:
+    python -m benchmarks.bench_router
+    python -m benchmarks.bench_router --live   # also time fast path vs supervisor (needs GROQ_API_KEY)
+
+The labelled questions below are deliberately different from the router's
+prototypes. "mixed" questions should go to the multimodal agent (or the
+supervisor), never to a single-modality agent.
+"""
+import argparse
+import time
+from chatbot.router import ROUTE_AGENTS, get_router
+
+LABELLED_QUERIES = [
+    ("What problem does retrieval augmented generation solve?", "text"),
+    ("Summarize the conclusion of the survey", "text"),
+    ("How is the retriever fine-tuned according to the authors?", "text"),
+    ("What is the difference between naive RAG and advanced RAG?", "text"),
+    ("Why do the authors argue that context length matters?", "text"),
+    ("What does the overview figure of the RAG paradigms show?", "image"),
+    ("Describe the picture of the indexing pipeline", "image"),
+    ("What stages are drawn in the workflow illustration?", "image"),
+    ("Explain the graph comparing the three paradigms", "image"),
+    ("What do the arrows in the architecture diagram mean?", "image"),
+    ("Which retriever reaches the best recall in the table?", "table"),
+    ("What is the mean score over all rows?", "table"),
+    ("How many methods are listed in the summary table?", "table"),
+    ("Give me the numbers for each dataset in the evaluation table", "table"),
+    ("Which row has the lowest latency value?", "table"),
+    ("Compare the figure of the pipeline with the numbers in the results table", "mixed"),
+    ("Explain the method and show where it appears in the diagram", "mixed"),
+]
+
+
+def offline(router):
+    dispatched = correct = fallbacks_on_mixed = mixed = 0
+    routed_mixed = correct_mixed = 0
+    routing_seconds = 0.0
+    for query, label in LABELLED_QUERIES:
+        start = time.perf_counter()
+        route, scores = router.route(query)
+        routing_seconds += time.perf_counter() - start
+        verdict = route or "supervisor"
+        if route == "mixed":
+            routed_mixed += 1
+            correct_mixed += label == "mixed"
+        if label == "mixed":
+            mixed += 1
+            fallbacks_on_mixed += route in (None, "mixed")
+        elif route and route != "mixed":
+            dispatched += 1
+            correct += route == label
+        print(f"   [{label:>5} -> {verdict:>10}] " + " ".join(f"{k}={v:.2f}" for k, v in scores.items()) + f"  {query}")
+
+    single = len(LABELLED_QUERIES) - mixed
+    print(f"\n🎯 Fast-path coverage: {dispatched}/{single} single-modality questions")
+    print(f"   Accuracy when dispatched: {correct / dispatched * 100 if dispatched else 0:.0f}%")
+    print(f"   Mixed questions kept away from single-modality agents: {fallbacks_on_mixed}/{mixed}")
+    # Precision: how many questions sent to the multimodal agent really were mixed
+    print(f"   Mixed route: {routed_mixed} routed, precision "
+          f"{correct_mixed / routed_mixed * 100 if routed_mixed else 0:.0f}%, "
+          f"recall {correct_mixed}/{mixed}")
+    print(f"   Mean routing time: {routing_seconds / len(LABELLED_QUERIES) * 1000:.1f} ms")
+
+
+def live(router):
+    from langchain.schema import HumanMessage
+    from chatbot.registry import get_agent, get_supervisor_app
+
+    supervisor = get_supervisor_app()
+    direct_seconds = supervisor_seconds = 0.0
+    timed = 0
+    for query, label in LABELLED_QUERIES:
+        route, _ = router.route(query)
+        if not route:
+            continue
+        inputs = {"messages": [HumanMessage(content=query)]}
+        start = time.perf_counter()
+        get_agent(ROUTE_AGENTS[route]).invoke(inputs)
+        direct_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        supervisor.invoke(inputs)
+        supervisor_seconds += time.perf_counter() - start
+        timed += 1
+
+    if timed:
+        print(f"\n⏱️ Over {timed} dispatched questions:")
+        print(f"   Supervisor path: {supervisor_seconds / timed:.1f}s per question")
+        print(f"   Fast path:       {direct_seconds / timed:.1f}s per question")
+        print(f"   Saved:           {(supervisor_seconds - direct_seconds) / timed:.1f}s per question")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the embedding fast-path router")
+    parser.add_argument("--live", action="store_true", help="Also time fast path against the supervisor")
+    args = parser.parse_args(argv)
+
+    router = get_router()
+    start = time.perf_counter()
+    router.warm_up()
+    print(f"🧭 Router ready in {time.perf_counter() - start:.1f}s "
+          f"(min score {router.min_score}, min margin {router.min_margin}, "
+          f"mixed min score {router.mixed_min_score})\n")
+    offline(router)
+    if args.live:
+        live(router)
+
+
+if __name__ == "__main__":
+    main()
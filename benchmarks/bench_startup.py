@@ -0,0 +1,84 @@
+"""Measure chatbot cold start: import cost, agent construction and first retrieval.
+
+Usage: python -m benchmarks.bench_startup [--query "what is query decomposition?"]
+
+Each phase runs in a fresh interpreter so module caches do not hide import
+cost. Building the agents needs GROQ_API_KEY and MODEL_NAME; the retrieval
+phase needs an ingested vector store.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["torch", "sentence_transformers", "chromadb", "langchain_chroma", "langchain_groq"]
+
+IMPORT_PHASE = """
+import json, sys, time
+start = time.perf_counter()
+import chatbot.main, chatbot.interface
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+BUILD_PHASE = """
+import json, time
+start = time.perf_counter()
+from chatbot.registry import get_supervisor_app, startup_timings
+get_supervisor_app()
+print(json.dumps({"seconds": time.perf_counter() - start, "parts": startup_timings()}))
+"""
+
+RETRIEVAL_PHASE = """
+import json, sys, time
+from chatbot.registry import start_warm_up
+warm = %s
+if warm:
+    start_warm_up().join()
+start = time.perf_counter()
+from chatbot.tools.text_retriever_tool import retrieve_text
+retrieve_text.invoke(%r)
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+
+def run_phase(code: str):
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0 or not lines:
+        return None, (completed.stderr.strip().splitlines() or ["no output"])[-1]
+    return json.loads(lines[-1]), None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure chatbot startup time")
+    parser.add_argument("--query", default="what is query decomposition?")
+    args = parser.parse_args(argv)
+
+    print("🚀 Chatbot startup benchmark")
+
+    result, error = run_phase(IMPORT_PHASE)
+    if error:
+        print(f"   Import failed: {error}")
+        return
+    print(f"   Import chatbot.main + interface: {result['seconds']:.2f}s")
+    print(f"   Heavy modules loaded at import: {', '.join(result['loaded']) or 'none'}")
+
+    result, error = run_phase(BUILD_PHASE)
+    if error:
+        print(f"   Agent build skipped: {error}")
+    else:
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result["parts"].items())
+        print(f"   Build supervisor and subagents: {result['seconds']:.2f}s ({parts})")
+
+    for warm in (False, True):
+        result, error = run_phase(RETRIEVAL_PHASE % (warm, args.query))
+        label = "after warm-up" if warm else "cold"
+        if error:
+            print(f"   First retrieval ({label}) skipped: {error}")
+        else:
+            print(f"   First retrieval ({label}): {result['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from chatbot.main import create_supervisor_app
+from chatbot.registry import chatbot_warm_up, get_chatbot_app, start_warm_up
 import logging
 
 logging.basicConfig(level=logging.DEBUG)
@@ -8,7 +8,10 @@ def get_chatbot_agent():
     """Get initialized agent with enhanced debugging"""
     try:
         logger.debug("Initializing supervisor app...")
-        agent = create_supervisor_app()
+        # Load the embedding model in the background while the UI comes up
+        if chatbot_warm_up:
+            start_warm_up()
+        agent = get_chatbot_app()
         
         # Debug the agent structure
         logger.debug(f"Agent type: {type(agent)}")
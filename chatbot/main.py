@@ -2,22 +2,25 @@
 import os
 from langchain.schema import HumanMessage
 
-from chatbot.model import initialize_model
-from chatbot.subagents.image_analysis_agent import image_text_analysis_agent
-from chatbot.subagents.text_analysis_agent import text_analysis_agent
-from chatbot.subagents.table_analysis_agent import table_analysis_agent
-from langgraph_supervisor import create_supervisor
+from chatbot.registry import get_agent, get_chat_model
 
 def create_supervisor_app():
     """Create and compile the supervisor workflow"""
-    # Initialize core components
+    from langgraph_supervisor import create_supervisor
+    
+    # One chat model shared by the supervisor and every subagent
     print("🚀 Initializing model...")
-    model = initialize_model()
+    model = get_chat_model()
    
     # Define supervisor with agents
     print("🧠 Creating supervisor workflow...")  
     supervisor_workflow = create_supervisor(
-    agents=[text_analysis_agent, image_text_analysis_agent, table_analysis_agent],
+    agents=[
+        get_agent("text_analysis_agent"),
+        get_agent("image_text_analysis_agent"),
+        get_agent("table_analysis_agent"),
+        get_agent("multimodal_analysis_agent")
+    ],
     model=model,
     prompt="""
     As the senior analysis coordinator, your responsibilities are:
@@ -26,7 +29,8 @@ def create_supervisor_app():
     - Text queries → Text Analysis Agent
     - Image-related queries → Image Analysis Agent  
     - Data/table queries → Table Analysis Agent
-    - Mixed queries → Combine relevant agents
+    - Mixed queries (text, figures and tables together) → Multimodal Analysis Agent,
+      which retrieves from all sources concurrently; avoid calling several agents in turn
     
     2. Quality Control:
     - Verify agent responses meet quality standards
@@ -0,0 +1,114 @@
+"""Lazy registry of the chat model, subagents and supervisor.
+
+Nothing is built at import time: the chat model is created once on first
+use and shared by every agent, and each subagent module (with its tools and
+retrievers) is only imported when that agent is first requested.
+get_chatbot_app() puts the embedding router in front of the supervisor, and
+start_warm_up() loads the embedding model (and router prototypes) in a
+background thread so the first question does not pay for it.
+"""
+from typing import Any, Dict, Optional
+import importlib
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+chatbot_warm_up = os.getenv("CHATBOT_WARM_UP", "1") != "0"
+
+# Agent name -> (module, builder taking the shared chat model)
+AGENT_BUILDERS = {
+    "text_analysis_agent": ("chatbot.subagents.text_analysis_agent", "create_text_analysis_agent"),
+    "image_text_analysis_agent": ("chatbot.subagents.image_analysis_agent", "create_image_analysis_agent"),
+    "table_analysis_agent": ("chatbot.subagents.table_analysis_agent", "create_table_analysis_agent"),
+    "multimodal_analysis_agent": (
+        "chatbot.subagents.multimodal_analysis_agent", "create_multimodal_analysis_agent"
+    ),
+}
+
+_lock = threading.RLock()
+_chat_model = None
+_agents: Dict[str, Any] = {}
+_supervisor_app = None
+_chatbot_app = None
+_warm_up_thread: Optional[threading.Thread] = None
+_timings: Dict[str, float] = {}
+
+
+def _timed(name: str, build):
+    start = time.perf_counter()
+    value = build()
+    _timings[name] = time.perf_counter() - start
+    return value
+
+
+def get_chat_model():
+    """The chat model shared by the supervisor and every subagent"""
+    global _chat_model
+    with _lock:
+        if _chat_model is None:
+            from chatbot.model import initialize_model
+            _chat_model = _timed("chat_model", initialize_model)
+    return _chat_model
+
+
+def get_agent(name: str):
+    """Build a subagent (and import its tools) on first request"""
+    with _lock:
+        if name not in _agents:
+            module_name, builder_name = AGENT_BUILDERS[name]
+            builder = getattr(importlib.import_module(module_name), builder_name)
+            model = get_chat_model()
+            _agents[name] = _timed(name, lambda: builder(model))
+    return _agents[name]
+
+
+def get_supervisor_app():
+    """The compiled supervisor workflow, built once per process"""
+    global _supervisor_app
+    with _lock:
+        if _supervisor_app is None:
+            from chatbot.main import create_supervisor_app
+            _supervisor_app = _timed("supervisor_app", create_supervisor_app)
+    return _supervisor_app
+
+
+def get_chatbot_app():
+    """What the UI invokes: the supervisor, behind the embedding fast-path router if enabled"""
+    global _chatbot_app
+    with _lock:
+        if _chatbot_app is None:
+            from chatbot.router import RoutedChatbot, chatbot_router_enabled, get_router
+            supervisor = get_supervisor_app()
+            _chatbot_app = RoutedChatbot(supervisor, get_router()) if chatbot_router_enabled else supervisor
+    return _chatbot_app
+
+
+def _warm_up():
+    try:
+        from chatbot.utilise.embedding_helper import get_embeddings
+        from chatbot.router import chatbot_router_enabled, get_router
+        _timed("embeddings", get_embeddings().warm_up)
+        if chatbot_router_enabled:
+            _timed("router_prototypes", get_router().warm_up)
+        logger.info(f"Warm-up finished: {', '.join(f'{k} {v:.1f}s' for k, v in _timings.items())}")
+    except Exception as e:
+        logger.warning(f"Warm-up failed, models will load on first use: {str(e)}")
+
+
+def start_warm_up() -> Optional[threading.Thread]:
+    """Load the embedding model in a daemon thread (once per process)"""
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up, name="chatbot-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def startup_timings() -> Dict[str, float]:
+    """Seconds spent building each component so far"""
+    with _lock:
+        return dict(_timings)
@@ -0,0 +1,212 @@
+"""Embedding fast path in front of the supervisor.
+
+Questions are compared with a few prototype queries per modality on the
+shared MiniLM embeddings. When one modality wins clearly (score and margin
+over the runner-up above the thresholds), the question goes straight to that
+subagent, skipping the supervisor's routing and synthesis LLM turns. When the
+top two modalities both clear the stricter mixed threshold but neither leads,
+the question is mixed and goes to the multimodal agent, which retrieves from
+every source concurrently. Anything else, including questions that are merely
+ambiguous, falls back to the supervisor.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+chatbot_router_enabled = os.getenv("CHATBOT_ROUTER", "1") != "0"
+router_min_score = float(os.getenv("ROUTER_MIN_SCORE", "0.35"))
+router_min_margin = float(os.getenv("ROUTER_MIN_MARGIN", "0.08"))
+# Both top modalities must reach this before a question counts as mixed
+router_mixed_min_score = float(os.getenv("ROUTER_MIXED_MIN_SCORE", "0.5"))
+
+# Similarity of a route is the mean of its best TOP_K prototype matches
+TOP_K = 3
+
+ROUTE_AGENTS = {
+    "text": "text_analysis_agent",
+    "image": "image_text_analysis_agent",
+    "table": "table_analysis_agent",
+    "mixed": "multimodal_analysis_agent",
+}
+
+PROTOTYPES = {
+    "text": [
+        "What is query decomposition?",
+        "Explain the main idea of the paper",
+        "Summarize the section on retrieval augmented generation",
+        "How does the proposed method work?",
+        "What are the limitations discussed by the authors?",
+        "Define the term used in the introduction",
+        "What does the document say about evaluation?",
+        "Compare the approaches described in the text",
+    ],
+    "image": [
+        "What does the figure show?",
+        "Describe the diagram of the architecture",
+        "What is illustrated in the image on page 3?",
+        "Explain the chart in figure 2",
+        "What does the pipeline diagram depict?",
+        "Which components appear in the flowchart?",
+        "What is shown in the screenshot?",
+        "Describe the visual layout of the framework figure",
+    ],
+    "table": [
+        "What are the values in the results table?",
+        "Which model has the highest score in the table?",
+        "What is the average accuracy across datasets?",
+        "List the rows of the comparison table",
+        "How many entries does the benchmark table have?",
+        "What is the total revenue by year?",
+        "Sort the methods by F1 score",
+        "Which dataset has the most samples according to the table?",
+    ],
+}
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class EmbeddingRouter:
+    """Nearest-prototype classifier on normalized sentence embeddings"""
+
+    def __init__(self, prototypes: Dict[str, List[str]], min_score: float, min_margin: float,
+                 mixed_min_score: float):
+        self.prototypes = prototypes
+        self.min_score = min_score
+        self.min_margin = min_margin
+        # Never looser than a single-modality dispatch
+        self.mixed_min_score = max(mixed_min_score, min_score)
+        self._vectors: Optional[Dict[str, List[List[float]]]] = None
+        self._lock = threading.Lock()
+
+    def _get_vectors(self) -> Dict[str, List[List[float]]]:
+        if self._vectors is None:
+            with self._lock:
+                if self._vectors is None:
+                    from chatbot.utilise.embedding_helper import get_embeddings
+                    # Goes through the embedding cache, so only the first run encodes them
+                    self._vectors = {
+                        route: get_embeddings().embed_documents(queries)
+                        for route, queries in self.prototypes.items()
+                    }
+        return self._vectors
+
+    def warm_up(self):
+        """Embed the prototypes now instead of on the first question"""
+        self._get_vectors()
+
+    def scores(self, query: str) -> Dict[str, float]:
+        from chatbot.utilise.embedding_helper import get_embeddings
+        vector = get_embeddings().embed_query(query)
+        result = {}
+        for route, vectors in self._get_vectors().items():
+            best = sorted((_dot(vector, prototype) for prototype in vectors), reverse=True)[:TOP_K]
+            result[route] = sum(best) / len(best)
+        return result
+
+    def route(self, query: str) -> Tuple[Optional[str], Dict[str, float]]:
+        """The confident route for a query (None to defer to the supervisor) and all scores"""
+        scores = self.scores(query)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+        if best_score >= self.min_score and best_score - runner_up >= self.min_margin:
+            return best, scores
+        # Two strong matches mean a mixed question; two middling ones are just ambiguous
+        if runner_up >= self.mixed_min_score:
+            return "mixed", scores
+        return None, scores
+
+
+def last_user_message(messages: List[Any]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, dict):
+            if message.get("role") in ("user", "human"):
+                return message.get("content", "")
+        elif getattr(message, "type", None) == "human":
+            return message.content
+    return ""
+
+
+class RoutedChatbot:
+    """Drop-in for the compiled supervisor: same invoke() input and output shape"""
+
+    def __init__(self, supervisor, router: EmbeddingRouter):
+        self.supervisor = supervisor
+        self.router = router
+        self._lock = threading.Lock()
+        self._stats = {
+            "fast_path": 0,
+            "fallback": 0,
+            "fast_path_seconds": 0.0,
+            "fallback_seconds": 0.0,
+            "routing_seconds": 0.0,
+            "routes": {route: 0 for route in ROUTE_AGENTS},
+        }
+
+    def _record(self, route: Optional[str], routing_seconds: float, seconds: float):
+        with self._lock:
+            key = "fast_path" if route else "fallback"
+            self._stats[key] += 1
+            self._stats[f"{key}_seconds"] += seconds
+            self._stats["routing_seconds"] += routing_seconds
+            if route:
+                self._stats["routes"][route] += 1
+
+    def invoke(self, inputs: Dict[str, Any], *args, **kwargs):
+        start = time.perf_counter()
+        query = last_user_message(inputs.get("messages", []))
+        route = None
+        if query:
+            try:
+                route, scores = self.router.route(query)
+                logger.debug(f"Router scores {scores} -> {route or 'supervisor'}")
+            except Exception as e:
+                logger.warning(f"Router failed, using the supervisor: {str(e)}")
+        routing_seconds = time.perf_counter() - start
+
+        if route:
+            from chatbot.registry import get_agent
+            response = get_agent(ROUTE_AGENTS[route]).invoke(inputs, *args, **kwargs)
+        else:
+            response = self.supervisor.invoke(inputs, *args, **kwargs)
+
+        self._record(route, routing_seconds, time.perf_counter() - start)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Fast-path share and estimated time saved versus the supervisor path"""
+        with self._lock:
+            stats = {**self._stats, "routes": dict(self._stats["routes"])}
+        total = stats["fast_path"] + stats["fallback"]
+        stats["fast_path_rate"] = stats["fast_path"] / total if total else 0.0
+        if stats["fast_path"] and stats["fallback"]:
+            saved_per_query = (
+                stats["fallback_seconds"] / stats["fallback"] - stats["fast_path_seconds"] / stats["fast_path"]
+            )
+            stats["estimated_seconds_saved"] = max(0.0, saved_per_query) * stats["fast_path"]
+        else:
+            stats["estimated_seconds_saved"] = None
+        return stats
+
+    def __getattr__(self, name):
+        # Anything else (stream, get_graph, ...) behaves like the supervisor
+        if name == "supervisor":
+            raise AttributeError(name)
+        return getattr(self.supervisor, name)
+
+
+_router: Optional[EmbeddingRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> EmbeddingRouter:
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = EmbeddingRouter(PROTOTYPES, router_min_score, router_min_margin, router_mixed_min_score)
+    return _router
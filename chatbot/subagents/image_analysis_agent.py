@@ -1,14 +1,7 @@
 from langgraph.prebuilt import create_react_agent
 from chatbot.tools.image_description_retriever_tool  import retrieve_image_text
-from chatbot.model import initialize_model
 
-model = initialize_model()
-
-image_text_analysis_agent = create_react_agent(
-    model=model,
-    tools=[retrieve_image_text],
-    name="image_text_analysis_agent",
-    prompt="""
+IMAGE_ANALYSIS_PROMPT = """
     You are a visual content specialist with expertise in analyzing images and their textual descriptions. Your role includes:
     
     1. Interpreting image captions and descriptions accurately
@@ -25,5 +18,21 @@ image_text_analysis_agent = create_react_agent(
     
     Current Analysis Request: {input}
     """
-)
 
+
+def create_image_analysis_agent(model):
+    """Build the image analysis subagent on the shared chat model"""
+    return create_react_agent(
+        model=model,
+        tools=[retrieve_image_text],
+        name="image_text_analysis_agent",
+        prompt=IMAGE_ANALYSIS_PROMPT
+    )
+
+
+def __getattr__(name):
+    # `from ... import image_text_analysis_agent` still works; the agent is built on first access
+    if name == "image_text_analysis_agent":
+        from chatbot.registry import get_agent
+        return get_agent("image_text_analysis_agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
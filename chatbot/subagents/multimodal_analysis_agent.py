@@ -0,0 +1,40 @@
+from langgraph.prebuilt import create_react_agent
+from chatbot.tools.combined_retriever_tool import retrieve_all
+from chatbot.tools.text_retriever_tool import expand_text_context
+from chatbot.tools.database_tool import database_query_tool, list_table_schemas
+
+MULTIMODAL_ANALYSIS_PROMPT = """
+    You are a document analyst who answers questions spanning prose, figures and tables. Your responsibilities include:
+    
+    1. Gathering text, image and table evidence with a single retrieve_all call
+    2. Connecting what the text explains with what figures show and tables quantify
+    3. Following up only where the first context is not enough
+    4. Giving one integrated, well-structured answer
+    
+    Working Method:
+    - Call retrieve_all first; it searches all sources at once within a fixed context budget
+    - Use expand_text_context with a Chunk ID when a passage needs its surrounding text
+    - For numbers, use the table IDs it returns with list_table_schemas and database_query_tool
+    - Cite which source (text, figure or table) each point comes from
+    - If a source had nothing relevant, say so instead of guessing
+    
+    Current Task: {input}
+    """
+
+
+def create_multimodal_analysis_agent(model):
+    """Build the multimodal analysis subagent on the shared chat model"""
+    return create_react_agent(
+        model=model,
+        tools=[retrieve_all, expand_text_context, list_table_schemas, database_query_tool],
+        name="multimodal_analysis_agent",
+        prompt=MULTIMODAL_ANALYSIS_PROMPT
+    )
+
+
+def __getattr__(name):
+    # `from ... import multimodal_analysis_agent` still works; the agent is built on first access
+    if name == "multimodal_analysis_agent":
+        from chatbot.registry import get_agent
+        return get_agent("multimodal_analysis_agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,7 @@
 from langgraph.prebuilt import create_react_agent
-from chatbot.tools.database_tool import database_query_tool
-from chatbot.model import initialize_model
+from chatbot.tools.database_tool import database_query_tool, list_table_schemas, search_tables
 
-model = initialize_model()
-
-table_analysis_agent = create_react_agent(
-    model=model,
-    tools=[database_query_tool],
-    name="table_analysis_agent",
-    prompt="""
+TABLE_ANALYSIS_PROMPT = """
     You are a data analysis expert specializing in tabular data interpretation. Your capabilities include:
     
     1. Precise analysis of structured data
@@ -16,6 +9,13 @@ table_analysis_agent = create_react_agent(
     3. Generating insightful summaries from tables
     4. Explaining complex data relationships clearly
     
+    Working with the database:
+    - Call search_tables with the key terms of the question to find relevant table IDs
+    - Call list_table_schemas to see the typed columns of the tables you will query
+    - Each extracted table is a real SQLite table named by its table_id; answer numeric
+      questions with SQL (SUM, AVG, COUNT, WHERE, ORDER BY ... LIMIT) in database_query_tool
+    - Select only the columns and rows you need; avoid reading html_content from table_metadata
+    
     Analysis Framework:
     1. [Structure] First examine the table structure
     2. [Context] Determine the data context and purpose  
@@ -31,5 +31,21 @@ table_analysis_agent = create_react_agent(
     
     Current Data Analysis Task: {input}
     """
-)
 
+
+def create_table_analysis_agent(model):
+    """Build the table analysis subagent on the shared chat model"""
+    return create_react_agent(
+        model=model,
+        tools=[search_tables, list_table_schemas, database_query_tool],
+        name="table_analysis_agent",
+        prompt=TABLE_ANALYSIS_PROMPT
+    )
+
+
+def __getattr__(name):
+    # `from ... import table_analysis_agent` still works; the agent is built on first access
+    if name == "table_analysis_agent":
+        from chatbot.registry import get_agent
+        return get_agent("table_analysis_agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
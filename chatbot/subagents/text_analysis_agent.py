@@ -1,20 +1,14 @@
 from langgraph.prebuilt import create_react_agent
-from chatbot.tools.text_retriever_tool import retrieve_text
-from chatbot.model import initialize_model
+from chatbot.tools.text_retriever_tool import retrieve_text, expand_text_context
 
-model = initialize_model()
-
-text_analysis_agent = create_react_agent(
-    model=model,
-    tools=[retrieve_text],
-    name="text_analysis_agent",
-    prompt="""
+TEXT_ANALYSIS_PROMPT = """
     You are an expert text analysis assistant with deep domain knowledge. Your responsibilities include:
     
     1. Analyzing and interpreting text content with high accuracy
     2. Providing comprehensive, well-structured responses
     3. Using the retrieval tool to find relevant context before answering
-    4. Maintaining academic rigor while being accessible
+    4. Using expand_text_context with a Chunk ID when a passage needs its surrounding text
+    5. Maintaining academic rigor while being accessible
     
     Response Guidelines:
     - Always begin by verifying you have the correct context
@@ -25,5 +19,21 @@ text_analysis_agent = create_react_agent(
     
     Current Task: {input}
     """
-)
 
+
+def create_text_analysis_agent(model):
+    """Build the text analysis subagent on the shared chat model"""
+    return create_react_agent(
+        model=model,
+        tools=[retrieve_text, expand_text_context],
+        name="text_analysis_agent",
+        prompt=TEXT_ANALYSIS_PROMPT
+    )
+
+
+def __getattr__(name):
+    # `from ... import text_analysis_agent` still works; the agent is built on first access
+    if name == "text_analysis_agent":
+        from chatbot.registry import get_agent
+        return get_agent("text_analysis_agent")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,148 @@
+# chatbot/tools/combined_retriever_tool.py
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Tuple
+import os
+import threading
+import time
+from chatbot.tools.text_retriever_tool import retrieve_text
+from chatbot.tools.image_description_retriever_tool import retrieve_image_text
+from chatbot.tools.database_tool import search_tables
+from nodes.llm_runner import estimate_tokens
+from langchain.tools import tool
+
+combined_retrieval_max_tokens = int(os.getenv("COMBINED_RETRIEVAL_MAX_TOKENS", "3000"))
+combined_retrieval_timeout = float(os.getenv("COMBINED_RETRIEVAL_TIMEOUT_SECONDS", "20"))
+
+# Results that mean a source had nothing to contribute
+EMPTY_RESULTS = ("No relevant", "No matching", "No results")
+
+SOURCE_COUNT = 3
+
+# Long-lived workers so each keeps its thread-local tables.db connection. A timed-out
+# call cannot be cancelled and keeps its worker, so there is one spare per source
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Source name -> a call that timed out and is still running
+_stuck: Dict[str, Future] = {}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2 * SOURCE_COUNT, thread_name_prefix="retrieval")
+    return _executor
+
+
+def _still_stuck(name: str) -> bool:
+    """Whether an earlier timed-out call to this source has still not returned"""
+    with _executor_lock:
+        future = _stuck.get(name)
+        if future is not None and future.done():
+            del _stuck[name]
+            future = None
+    return future is not None
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep whole paragraphs while they fit, then cut the next one"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Leave room for the truncation note
+    max_tokens -= 15
+    kept = []
+    used = 0
+    for paragraph in text.split("\n\n"):
+        cost = estimate_tokens(paragraph)
+        if used + cost > max_tokens:
+            remaining_chars = (max_tokens - used) * 4
+            if remaining_chars > 80:
+                kept.append(paragraph[:remaining_chars] + "…")
+            break
+        kept.append(paragraph)
+        used += cost
+    return "\n\n".join(kept) + "\n\n(… truncated to fit the context budget)"
+
+
+def allocate_budget(sizes: List[int], budget: int) -> List[int]:
+    """Split a token budget fairly: small sections keep everything, the rest share what is left"""
+    allocation = [0] * len(sizes)
+    remaining = budget
+    pending = sorted(range(len(sizes)), key=lambda position: sizes[position])
+    while pending:
+        share = remaining // len(pending)
+        position = pending.pop(0)
+        allocation[position] = min(sizes[position], share)
+        remaining -= allocation[position]
+    return allocation
+
+
+def gather(query: str) -> List[Tuple[str, str, float]]:
+    """Run all three retrievers concurrently: (source, result, seconds) in a fixed order"""
+    sources = [
+        ("Text passages", lambda: retrieve_text.invoke(query)),
+        ("Image descriptions", lambda: retrieve_image_text.invoke(query)),
+        ("Matching tables", lambda: search_tables(query)),
+    ]
+
+    def timed(fetch):
+        start = time.perf_counter()
+        return fetch(), time.perf_counter() - start
+
+    executor = _get_executor()
+    # A source whose last call hung is skipped instead of queueing behind it
+    futures = [
+        (name, None if _still_stuck(name) else executor.submit(timed, fetch))
+        for name, fetch in sources
+    ]
+    deadline = time.monotonic() + combined_retrieval_timeout
+    results = []
+    for name, future in futures:
+        if future is None:
+            results.append((name, f"{name} unavailable: an earlier call has not returned yet", 0.0))
+            continue
+        try:
+            result, seconds = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            with _executor_lock:
+                _stuck[name] = future
+            result, seconds = f"{name} timed out after {combined_retrieval_timeout:.0f}s", combined_retrieval_timeout
+        except Exception as e:
+            result, seconds = f"{name} error: {str(e)}", 0.0
+        results.append((name, result, seconds))
+    return results
+
+
+@tool
+def retrieve_all(query: str) -> str:
+    """
+    Retrieve text passages, image descriptions and matching tables for a query in one call
+
+    The three sources are searched concurrently and merged into one context that fits
+    a fixed token budget. Use it for questions that span prose, figures and tables.
+
+    Args:
+        query: The search query string
+
+    Returns:
+        One section per source with relevant content, table IDs for follow-up SQL and chunk IDs
+    """
+    try:
+        gathered = gather(query)
+        results = [
+            (name, result) for name, result, _ in gathered
+            if result and not result.startswith(EMPTY_RESULTS)
+        ]
+        if not results:
+            return "No relevant content found in text, images or tables"
+
+        budgets = allocate_budget([estimate_tokens(result) for _, result in results], combined_retrieval_max_tokens)
+        sections = [
+            f"## {name}\n{truncate_to_tokens(result, budget)}"
+            for (name, result), budget in zip(results, budgets)
+        ]
+        # Wall time is the slowest source, not the sum
+        timings = ", ".join(f"{name.split()[0].lower()} {seconds:.1f}s" for name, _, seconds in gathered)
+        return "\n\n".join(sections) + f"\n\n(sources searched concurrently: {timings})"
+    except Exception as e:
+        return f"Combined retrieval error: {str(e)}"
@@ -1,6 +1,28 @@
+import json
+import os
 import sqlite3
+import time
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
+from chatbot.utilise.sql_helper import get_connection
+from knowledge_creation.table_materializer import ensure_schema_registry
+from knowledge_creation.table_search import search_tables as search_table_index
+
+# Budgets that keep a careless SELECT * from flooding the LLM context
+db_tool_max_rows = int(os.getenv("DB_TOOL_MAX_ROWS", "50"))
+db_tool_max_bytes = int(os.getenv("DB_TOOL_MAX_BYTES", "8000"))
+db_tool_max_cell_chars = int(os.getenv("DB_TOOL_MAX_CELL_CHARS", "200"))
+db_tool_timeout_seconds = float(os.getenv("DB_TOOL_TIMEOUT_SECONDS", "5"))
+
+# Columns holding whole documents, left out unless asked for
+LARGE_COLUMNS = {"html_content"}
+# SQLite VM instructions between progress-handler (timeout) checks
+PROGRESS_INTERVAL = 10000
+# Rows past the budget are still counted, up to this many
+MAX_COUNTED_ROWS = 10000
+FETCH_SIZE = 100
+# Characters each cell keeps at least when one row alone is over the byte budget
+MIN_CELL_CHARS = 16
 
 class DatabaseQueryToolInput(BaseModel):
     """Input for the database query tool."""
@@ -9,24 +31,98 @@ class DatabaseQueryToolInput(BaseModel):
         default=None,
         description="Optional parameters for parameterized queries"
     )
+    include_large_columns: bool = Field(
+        default=False,
+        description="Return large columns such as html_content instead of omitting them"
+    )
+
+
+def render_cell(value: Any, max_chars: Optional[int] = None) -> str:
+    max_chars = max_chars or db_tool_max_cell_chars
+    if value is None:
+        return "NULL"
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    text = " ".join(str(value).split())
+    if len(text) > max_chars:
+        text = text[:max_chars] + f"…(+{len(text) - max_chars} chars)"
+    return text.replace("|", "\\|")
+
+
+def render_rows(cursor: sqlite3.Cursor, include_large_columns: bool = False) -> str:
+    """Pipe-separated rows within the row and byte budgets, with a count of what was cut"""
+    columns = [description[0] for description in cursor.description]
+    keep = [
+        position for position, column in enumerate(columns)
+        if include_large_columns or column not in LARGE_COLUMNS
+    ]
+    omitted = [columns[position] for position in range(len(columns)) if position not in keep]
+
+    lines = [" | ".join(columns[position] for position in keep)]
+    size = len(lines[0])
+    shown = truncated = 0
+    first_row_cut = False
+    while True:
+        batch = cursor.fetchmany(FETCH_SIZE)
+        if not batch:
+            break
+        for row in batch:
+            if truncated:
+                truncated += 1
+                continue
+            line = " | ".join(render_cell(row[position]) for position in keep)
+            if not shown and size + len(line) + 1 > db_tool_max_bytes:
+                # Always show one row so the agent sees the data shape: cut its cells to share the budget
+                cell_chars = max(MIN_CELL_CHARS, (db_tool_max_bytes - size) // max(len(keep), 1) - 20)
+                line = " | ".join(render_cell(row[position], cell_chars) for position in keep)
+                first_row_cut = True
+            elif shown >= db_tool_max_rows or size + len(line) + 1 > db_tool_max_bytes:
+                truncated = 1
+                continue
+            lines.append(line)
+            size += len(line) + 1
+            shown += 1
+        if truncated >= MAX_COUNTED_ROWS:
+            break
+
+    if not shown and not truncated:
+        return "No results found."
+
+    notes = []
+    if first_row_cut:
+        notes.append(f"cells of the first row shortened to fit {db_tool_max_bytes} bytes")
+    if truncated:
+        count = f"{truncated}+" if truncated >= MAX_COUNTED_ROWS else str(truncated)
+        notes.append(
+            f"{count} more rows not shown (limit {db_tool_max_rows} rows / {db_tool_max_bytes} bytes); "
+            "aggregate or add WHERE/LIMIT to narrow the query"
+        )
+    if omitted:
+        notes.append(f"Omitted large columns: {', '.join(omitted)}")
+    return "\n".join(lines + [f"({note})" for note in notes])
 
-def database_query_tool(query: str, parameters: Optional[Dict[str, Any]] = None) -> str:
+def database_query_tool(query: str, parameters: Optional[Dict[str, Any]] = None,
+                        include_large_columns: bool = False) -> str:
     """
     Executes SQL queries against the SQLite database (tables.db) and returns the results.
     Handles SELECT queries (returning data) and other queries (returning status).
-    Provides error handling and safe query execution.
+    Results are capped in rows and size, long cells are shortened and large columns such as
+    html_content are omitted, so prefer aggregates (SUM, AVG, COUNT) and WHERE/LIMIT.
+    Queries running longer than a few seconds are aborted.
     
     Args:
         query: The SQL query to execute
         parameters: Optional dictionary of parameters for parameterized queries
+        include_large_columns: Return large columns such as html_content instead of omitting them
         
     Returns:
-        str: Query results as a string or error message
+        str: Pipe-separated rows with a header line, or a status or error message
     """
+    conn = get_connection()  # Shared per-thread WAL connection, rows accessible by name
+    deadline = time.monotonic() + db_tool_timeout_seconds
+    # A non-zero return makes SQLite interrupt the running statement
+    conn.set_progress_handler(lambda: int(time.monotonic() > deadline), PROGRESS_INTERVAL)
     try:
-        # Connect to the database
-        conn = sqlite3.connect('tables.db')
-        conn.row_factory = sqlite3.Row  # Allows accessing columns by name
         cursor = conn.cursor()
         
         # Execute the query with parameters if provided
@@ -35,29 +131,91 @@ def database_query_tool(query: str, parameters: Optional[Dict[str, Any]] = None)
         else:
             cursor.execute(query)
         
-        # Handle SELECT queries (return data)
-        if query.strip().upper().startswith('SELECT'):
-            results = cursor.fetchall()
-            if not results:
-                return "No results found."
-            
-            # Convert results to a readable format
-            columns = [description[0] for description in cursor.description]
-            output = []
-            for row in results:
-                row_dict = dict(row)
-                output.append(row_dict)
-            
-            return str(output)
+        # Statements producing rows (SELECT, WITH, PRAGMA) are rendered within the budgets
+        if cursor.description is not None:
+            return render_rows(cursor, include_large_columns)
         # Handle other queries (return status)
         else:
             conn.commit()
             return f"Query executed successfully. Rows affected: {cursor.rowcount}"
             
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        if time.monotonic() > deadline:
+            return f"Query aborted after {db_tool_timeout_seconds:.0f}s; narrow it with WHERE, LIMIT or an aggregate."
+        return f"Database error occurred: {str(e)}"
     except sqlite3.Error as e:
+        # Leave the shared connection clean for the next call
+        conn.rollback()
         return f"Database error occurred: {str(e)}"
     except Exception as e:
+        conn.rollback()
         return f"Unexpected error occurred: {str(e)}"
     finally:
-        if conn:
-            conn.close()
+        conn.set_progress_handler(None, 0)
+
+
+def list_table_schemas(source_document: Optional[str] = None) -> str:
+    """
+    Lists the queryable SQL tables extracted from documents, with their columns and types.
+    Each extracted table is stored as its own SQLite table (named by table_id) with typed
+    columns, so numeric questions can be answered with SUM/AVG/WHERE in database_query_tool.
+    
+    Args:
+        source_document: Optional document path to only list that document's tables
+        
+    Returns:
+        str: One line per table with its SQL name, page, row count, description and columns
+    """
+    try:
+        conn = get_connection()
+        # The registry only exists once a table was materialized
+        ensure_schema_registry(conn.cursor())
+        conn.commit()
+        query = "SELECT sql_table, source_document, page_number, columns, row_count, description FROM table_schemas"
+        params = ()
+        if source_document:
+            query += " WHERE source_document = ?"
+            params = (source_document,)
+        rows = conn.execute(query + " ORDER BY source_document, page_number", params).fetchall()
+        if not rows:
+            return "No queryable tables found."
+        
+        lines = []
+        for sql_table, document, page_number, columns, row_count, description in rows:
+            column_list = ", ".join(
+                f"{column['name']} {column['type']} ('{column['header']}')" for column in json.loads(columns)
+            )
+            summary = (description or "").split("\n")[0][:200]
+            lines.append(
+                f"{sql_table} [{document}, page {page_number}, {row_count} rows]: {summary}\n  columns: {column_list}"
+            )
+        return "\n".join(lines)
+    except sqlite3.Error as e:
+        return f"Database error occurred: {str(e)}"
+
+
+def search_tables(query: str, limit: int = 5) -> str:
+    """
+    Full-text search over table descriptions, table contents and source documents, ranked by BM25.
+    Use this to find which tables are relevant before querying them, instead of LIKE scans.
+    
+    Args:
+        query: Words describing the data you are looking for
+        limit: Maximum number of tables to return
+        
+    Returns:
+        str: Matching table IDs with their document and highlighted snippets, best first
+    """
+    try:
+        matches = search_table_index(get_connection().cursor(), query, max(1, min(limit, 20)))
+        if not matches:
+            return "No matching tables found."
+        
+        return "\n".join(
+            f"{match['table_id']} [{match['source_document']}]: {match['description_snippet']}"
+            + (f" | {match['text_snippet']}" if match['text_snippet'] else "")
+            for match in matches
+        )
+    except sqlite3.Error as e:
+        return f"Database error occurred: {str(e)}"
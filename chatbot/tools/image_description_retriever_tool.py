@@ -1,10 +1,8 @@
 # chatbot/tools/image_description_retriever_tool.py
 from chatbot.utilise.image_helper import get_image_retriever
+from knowledge_creation.blob_store import load_json
 from langchain.tools import tool
 
-# Initialize retriever
-image_retriever = get_image_retriever()
-
 @tool
 def retrieve_image_text(query: str) -> str:
     """
@@ -17,15 +15,28 @@ def retrieve_image_text(query: str) -> str:
         Concatenated relevant image descriptions or error message
     """
     try:
-        docs = image_retriever.invoke(query)
+        # Built on first use; the vector store behind it is a process-wide singleton
+        docs = get_image_retriever().invoke(query)
         if not docs:
             return "No relevant image descriptions found"
             
         results = []
         for doc in docs:
             results.append(doc.page_content)
+            if 'metadata_path' in doc.metadata:
+                # Resolved through the blob store; legacy file paths still load from disk
+                try:
+                    metadata = load_json(doc.metadata['metadata_path'])
+                    if metadata.get('width'):
+                        results.append(f"Image size: {metadata['width']}x{metadata['height']}")
+                except (KeyError, OSError, ValueError):
+                    pass
+            if doc.metadata.get('pages'):
+                results.append(f"Appears on pages: {doc.metadata['pages']}")
             if 'image_path' in doc.metadata:
                 results.append(f"Image location: {doc.metadata['image_path']}")
+            if doc.metadata.get('thumbnail_path'):
+                results.append(f"Thumbnail: {doc.metadata['thumbnail_path']}")
         
         return "\n\n".join(results)
     except Exception as e:
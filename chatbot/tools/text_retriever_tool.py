@@ -1,10 +1,9 @@
 # chatbot/tools/text_retriever_tool.py
 from chatbot.utilise.text_helper import get_text_retriever
+from knowledge_creation.blob_store import load_json
+from knowledge_creation.docstore import get_neighbouring_chunks
 from langchain.tools import tool
 
-# Initialize retriever
-text_retriever = get_text_retriever()
-
 @tool
 def retrieve_text(query: str) -> str:
     """
@@ -17,17 +16,54 @@ def retrieve_text(query: str) -> str:
         Concatenated relevant text chunks with metadata
     """
     try:
-        docs = text_retriever.invoke(query)
+        # Built on first use; the vector store behind it is a process-wide singleton
+        docs = get_text_retriever().invoke(query)
         if not docs:
             return "No relevant text found"
             
         results = []
         for doc in docs:
             results.append(doc.page_content)
-            if 'json_path' in doc.metadata:
+            if 'chunk_id' in doc.metadata and 'json_path' not in doc.metadata:
+                results.append(f"Source: {doc.metadata['source_document']}")
+                if doc.metadata.get('page_number'):
+                    results.append(f"Page: {doc.metadata['page_number']}")
+                results.append(f"Chunk ID: {doc.metadata['chunk_id']}")
+            elif 'json_path' in doc.metadata:
                 results.append(f"Source: {doc.metadata['source_document']}")
+                # json_path is a blob:// reference (or a legacy file path) resolved via the blob store
+                try:
+                    record = load_json(doc.metadata['json_path'])
+                    if record.get('page_number'):
+                        results.append(f"Page: {record['page_number']}")
+                except (KeyError, OSError, ValueError):
+                    pass
                 results.append(f"Full text available at: {doc.metadata['json_path']}")
         
         return "\n\n".join(results)
     except Exception as e:
-        return f"Text retrieval error: {str(e)}"
\ No newline at end of file
+        return f"Text retrieval error: {str(e)}"
+
+@tool
+def expand_text_context(chunk_id: str, window: int = 1) -> str:
+    """
+    Fetch the text surrounding a retrieved chunk, in document order
+    
+    Args:
+        chunk_id: The Chunk ID shown in a retrieve_text result
+        window: How many chunks to include before and after it
+        
+    Returns:
+        The chunk and its neighbours with page numbers
+    """
+    try:
+        chunks = get_neighbouring_chunks(chunk_id, max(0, min(window, 5)))
+        if not chunks:
+            return f"No chunk found with ID {chunk_id}"
+        
+        return "\n\n".join(
+            f"[Page {chunk['page_number']}, chunk {chunk['chunk_index']}]\n{chunk['text']}"
+            for chunk in chunks
+        )
+    except Exception as e:
+        return f"Text context error: {str(e)}"
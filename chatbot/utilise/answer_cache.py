@@ -0,0 +1,218 @@
+"""Semantic answer cache in front of the chatbot.
+
+A question is embedded with the shared MiniLM model and compared with the
+questions answered before; when the closest one is similar enough (cosine on
+normalized vectors) and still fresh, its stored answer is returned without
+invoking the agents. Entries are scoped to a corpus version derived from the
+docstore (text chunks plus the ingestion stamp every store node writes, so
+image-only documents count too), tables.db and the chat model, so
+re-ingesting or adding a document makes every earlier answer unreachable.
+Old entries expire after a TTL and the least recently used ones are evicted
+above a size cap.
+"""
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+answer_cache_enabled = os.getenv("ANSWER_CACHE", "1") != "0"
+answer_cache_path = os.getenv("ANSWER_CACHE_PATH", "answer_cache.db")
+answer_cache_threshold = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+answer_cache_ttl_hours = float(os.getenv("ANSWER_CACHE_TTL_HOURS", "168"))
+answer_cache_max_entries = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+# How long a computed corpus version is trusted before the stores are checked again
+VERSION_REFRESH_SECONDS = 10
+
+# Answer fields worth replaying; raw agent messages are not stored
+CACHED_FIELDS = ("content", "agent_calls", "total_tokens", "responding_agent")
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(answer_cache_path, timeout=30)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            corpus_version TEXT,
+            question TEXT,
+            vector BLOB,
+            answer TEXT,
+            created_at REAL,
+            last_hit_at REAL,
+            hits INTEGER DEFAULT 0
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_version ON answers (corpus_version)")
+    return conn
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def compute_corpus_version() -> str:
+    """Hash of what the agents can see: ingested chunks, ingestion stamps, stored tables and the chat model"""
+    from knowledge_creation.docstore import corpus_fingerprint
+    from chatbot.utilise.sql_helper import get_connection
+    tables = tuple(get_connection().execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM table_metadata").fetchone())
+    parts = [corpus_fingerprint(), tables, os.getenv("MODEL_NAME")]
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class AnswerCache:
+    """Nearest past question per corpus version, kept in memory and persisted in SQLite"""
+
+    def __init__(self, threshold: float, ttl_seconds: float, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._version_checked_at = 0.0
+        # (id, vector) of every live entry for the current version
+        self._index: List[Tuple[int, List[float]]] = []
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "stores": 0, "errors": 0, "tokens_saved": 0}
+
+    def _current_version(self) -> str:
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < VERSION_REFRESH_SECONDS:
+            return self._version
+        version = compute_corpus_version()
+        self._version_checked_at = now
+        if version != self._version:
+            self._load(version)
+        return version
+
+    def _load(self, version: str):
+        conn = _connect()
+        try:
+            with conn:
+                # Answers about another corpus can never be served again
+                dropped = conn.execute("DELETE FROM answers WHERE corpus_version != ?", (version,)).rowcount
+                conn.execute("DELETE FROM answers WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            rows = conn.execute("SELECT id, vector FROM answers WHERE corpus_version = ?", (version,)).fetchall()
+        finally:
+            conn.close()
+        if dropped:
+            logger.info(f"Corpus changed, dropped {dropped} cached answers")
+        self._version = version
+        self._index = [(entry_id, _unpack(blob)) for entry_id, blob in rows]
+
+    def _nearest(self, vector: Sequence[float]) -> Tuple[Optional[int], float]:
+        best_id, best_score = None, -1.0
+        for entry_id, candidate in self._index:
+            score = _dot(vector, candidate)
+            if score > best_score:
+                best_id, best_score = entry_id, score
+        return best_id, best_score
+
+    def lookup(self, question: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(cached answer or None, key to pass to store() after a miss)"""
+        from chatbot.utilise.embedding_helper import get_embeddings
+        vector = get_embeddings().embed_query(question)
+        with self._lock:
+            self._stats["lookups"] += 1
+            version = self._current_version()
+            entry_id, score = self._nearest(vector)
+            key = {"version": version, "question": question, "vector": vector}
+            if entry_id is None or score < self.threshold:
+                self._stats["misses"] += 1
+                return None, key
+
+            conn = _connect()
+            try:
+                with conn:
+                    row = conn.execute(
+                        "SELECT question, answer, created_at FROM answers WHERE id = ?", (entry_id,)
+                    ).fetchone()
+                    fresh = row is not None and time.time() - row[2] < self.ttl_seconds
+                    if fresh:
+                        conn.execute(
+                            "UPDATE answers SET hits = hits + 1, last_hit_at = ? WHERE id = ?", (time.time(), entry_id)
+                        )
+                    else:
+                        conn.execute("DELETE FROM answers WHERE id = ?", (entry_id,))
+            finally:
+                conn.close()
+
+            if not fresh:
+                self._index = [entry for entry in self._index if entry[0] != entry_id]
+                self._stats["misses"] += 1
+                return None, key
+
+            answer = json.loads(row[1])
+            self._stats["hits"] += 1
+            self._stats["tokens_saved"] += answer.get("total_tokens", 0)
+        return {**answer, "cached_question": row[0], "similarity": score}, None
+
+    def store(self, key: Dict[str, Any], response: Dict[str, Any]):
+        """Remember a successful answer for the question looked up under key"""
+        answer = {field: response.get(field) for field in CACHED_FIELDS}
+        with self._lock:
+            if key["version"] != self._version:
+                # The corpus changed while the agent was answering
+                return
+            now = time.time()
+            conn = _connect()
+            try:
+                with conn:
+                    entry_id = conn.execute(
+                        "INSERT INTO answers (corpus_version, question, vector, answer, created_at, last_hit_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (key["version"], key["question"], _pack(key["vector"]), json.dumps(answer), now, now)
+                    ).lastrowid
+                    excess = len(self._index) + 1 - self.max_entries
+                    evicted = []
+                    if excess > 0:
+                        evicted = [row[0] for row in conn.execute(
+                            "SELECT id FROM answers ORDER BY last_hit_at ASC LIMIT ?", (excess,)
+                        )]
+                        conn.executemany("DELETE FROM answers WHERE id = ?", [(row_id,) for row_id in evicted])
+            finally:
+                conn.close()
+            self._index.append((entry_id, list(key["vector"])))
+            if evicted:
+                evicted = set(evicted)
+                self._index = [entry for entry in self._index if entry[0] not in evicted]
+            self._stats["stores"] += 1
+
+    def record_error(self):
+        with self._lock:
+            self._stats["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate and size since this process started"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._index)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache(answer_cache_threshold, answer_cache_ttl_hours * 3600, answer_cache_max_entries)
+    return _cache
@@ -0,0 +1,76 @@
+from array import array
+from typing import Dict, List, Sequence
+import hashlib
+import os
+import sqlite3
+
+embedding_cache_enabled = os.getenv("EMBEDDING_CACHE", "1") != "0"
+embedding_cache_path = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.db")
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lookups
+LOOKUP_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(embedding_cache_path, timeout=30)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model_id TEXT,
+            normalized INTEGER,
+            text_hash TEXT,
+            vector BLOB,
+            PRIMARY KEY (model_id, normalized, text_hash)
+        ) WITHOUT ROWID
+    ''')
+    return conn
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    """float32 little-endian bytes, 4 bytes per dimension"""
+    packed = array("f", vector)
+    if packed.itemsize != 4:
+        raise ValueError("array('f') is not float32 on this platform")
+    return packed.tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+def get_vectors(model_id: str, normalized: bool, hashes: List[str]) -> Dict[str, List[float]]:
+    """Look up cached vectors for the given text hashes"""
+    found = {}
+    conn = _connect()
+    try:
+        for start in range(0, len(hashes), LOOKUP_BATCH):
+            batch = hashes[start:start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embeddings "
+                f"WHERE model_id = ? AND normalized = ? AND text_hash IN ({placeholders})",
+                [model_id, int(normalized), *batch]
+            )
+            for hash_value, blob in rows:
+                found[hash_value] = _unpack(blob)
+    finally:
+        conn.close()
+    return found
+
+
+def put_vectors(model_id: str, normalized: bool, vectors: Dict[str, Sequence[float]]) -> None:
+    """Store vectors keyed by text hash in a single transaction"""
+    conn = _connect()
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model_id, normalized, text_hash, vector) VALUES (?, ?, ?, ?)",
+            [(model_id, int(normalized), hash_value, _pack(vector)) for hash_value, vector in vectors.items()]
+        )
+        conn.commit()
+    finally:
+        conn.close()
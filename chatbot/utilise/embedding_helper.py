@@ -0,0 +1,140 @@
+from langchain_core.embeddings import Embeddings
+from typing import Optional, List, Dict, Any
+import threading
+import time
+import os
+import logging
+from chatbot.utilise import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+embedding_model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+# Unset picks CUDA when available and falls back to CPU
+embedding_device = os.getenv("EMBEDDING_DEVICE")
+
+
+class SharedEmbeddings(Embeddings):
+    """Lazily loaded sentence-transformers model shared by every vector store"""
+
+    def __init__(self, model_name: str, batch_size: int, device: Optional[str] = None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.device = device
+        self.normalize = True
+        self._model = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "load_seconds": 0.0,
+            "texts_encoded": 0,
+            "encode_seconds": 0.0,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        }
+
+    def _load(self, device: str):
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(
+            model_name=self.model_name,
+            model_kwargs={'device': device},
+            encode_kwargs={'normalize_embeddings': self.normalize, 'batch_size': self.batch_size}
+        )
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    device = self.device
+                    if device is None:
+                        import torch
+                        device = "cuda" if torch.cuda.is_available() else "cpu"
+                    try:
+                        model = self._load(device)
+                    except Exception as e:
+                        if device == "cpu":
+                            raise
+                        logger.warning(f"Embedding load on {device} failed, falling back to CPU: {str(e)}")
+                        device = "cpu"
+                        model = self._load(device)
+                    self.device = device
+                    self._stats["load_seconds"] = time.perf_counter() - start
+                    logger.info(f"Loaded {self.model_name} on {device} in {self._stats['load_seconds']:.1f}s")
+                    self._model = model
+        return self._model
+
+    def _record(self, count: int, seconds: float):
+        with self._lock:
+            self._stats["texts_encoded"] += count
+            self._stats["encode_seconds"] += seconds
+
+    def _record_cache(self, hits: int, misses: int):
+        with self._lock:
+            self._stats["cache_hits"] += hits
+            self._stats["cache_misses"] += misses
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        model = self._get_model()
+        start = time.perf_counter()
+        vectors = model.embed_documents(texts)
+        self._record(len(texts), time.perf_counter() - start)
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, encoding only texts missing from the persistent cache"""
+        if not embedding_cache.embedding_cache_enabled:
+            return self._encode(texts)
+
+        hashes = [embedding_cache.text_hash(text) for text in texts]
+        cached = embedding_cache.get_vectors(self.model_name, self.normalize, hashes)
+
+        # Encode each distinct missing text once
+        missing = {}
+        for hash_value, text in zip(hashes, texts):
+            if hash_value not in cached and hash_value not in missing:
+                missing[hash_value] = text
+
+        encoded = dict(zip(missing, self._encode(list(missing.values()))))
+        if encoded:
+            embedding_cache.put_vectors(self.model_name, self.normalize, encoded)
+        self._record_cache(len(texts) - len(missing), len(missing))
+
+        return [cached[hash_value] if hash_value in cached else encoded[hash_value] for hash_value in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        model = self._get_model()
+        start = time.perf_counter()
+        vector = model.embed_query(text)
+        self._record(1, time.perf_counter() - start)
+        return vector
+
+    def warm_up(self):
+        """Load the model now instead of on first use"""
+        self._get_model()
+
+    def stats(self) -> Dict[str, Any]:
+        """Load time and encoding throughput since process start"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["loaded"] = self._model is not None
+        stats["device"] = self.device
+        stats["texts_per_second"] = (
+            stats["texts_encoded"] / stats["encode_seconds"] if stats["encode_seconds"] else 0.0
+        )
+        return stats
+
+
+# Process-wide singleton shared by the text and image vector stores
+_embeddings: Optional[SharedEmbeddings] = None
+_embeddings_lock = threading.Lock()
+
+
+def get_embeddings() -> SharedEmbeddings:
+    """Get the shared embedding provider (the model itself loads on first use)"""
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = SharedEmbeddings(embedding_model_name, embedding_batch_size, embedding_device)
+    return _embeddings
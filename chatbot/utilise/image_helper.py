@@ -1,51 +1,28 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
-from typing import Optional
-import torch
+from typing import Optional, TYPE_CHECKING
+from chatbot.utilise.embedding_helper import get_embeddings
 import logging
 
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Global variable declaration
-_image_vector_store: Optional[Chroma] = None
+_image_vector_store: Optional["Chroma"] = None
 
-def get_image_vector_store() -> Chroma:
-    """Initialize image vector store with proper device handling"""
+def get_image_vector_store() -> "Chroma":
+    """Initialize image vector store on the shared embedding provider"""
     global _image_vector_store
     
     if _image_vector_store is None:
         try:
-            # Force CPU initialization first
-            logger.info("Initializing embeddings with CPU first")
-            embeddings = HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={'device': 'cpu'},
-                encode_kwargs={'normalize_embeddings': True}
-            )
-            
-            # Test embeddings
-            test_embedding = embeddings.embed_query("test")
-            logger.info(f"Embedding test successful. Vector length: {len(test_embedding)}")
-            
-            # Now try GPU if available
-            if torch.cuda.is_available():
-                try:
-                    logger.info("Attempting GPU initialization")
-                    embeddings = HuggingFaceEmbeddings(
-                        model_name="all-MiniLM-L6-v2",
-                        model_kwargs={'device': 'cuda'},
-                        encode_kwargs={'normalize_embeddings': True}
-                    )
-                    test_embedding = embeddings.embed_query("test")
-                    logger.info("GPU initialization successful")
-                except Exception as e:
-                    logger.warning(f"GPU initialization failed, falling back to CPU: {str(e)}")
-            
+            # Imported here so importing the chatbot does not load chromadb
+            from langchain_chroma import Chroma
             _image_vector_store = Chroma(
                 collection_name="image_descriptions",
-                embedding_function=embeddings,
+                embedding_function=get_embeddings(),
                 persist_directory="image_vector_store"
             )
             logger.info("Image vector store initialized successfully")
@@ -58,4 +35,4 @@ def get_image_vector_store() -> Chroma:
 
 def get_image_retriever():
     """Get the retriever from the image vector store"""
-    return get_image_vector_store().as_retriever()
\ No newline at end of file
+    return get_image_vector_store().as_retriever()
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+import logging
+import os
+import sqlite3
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+tables_db_path = os.getenv("TABLES_DB_PATH", "tables.db")
+sqlite_mmap_bytes = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 ** 2)))
+sqlite_cache_kb = int(os.getenv("SQLITE_CACHE_KB", str(64 * 1024)))
+
+# Prepared statements kept per connection (sqlite3 reuses them for identical SQL text)
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT_SECONDS = 30
+
+_local = threading.local()
+
+
+def _configure(conn: sqlite3.Connection):
+    # WAL lets chat queries read while ingestion writes; NORMAL is durable in WAL mode
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={sqlite_mmap_bytes}")
+    conn.execute(f"PRAGMA cache_size=-{sqlite_cache_kb}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS table_metadata (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_id TEXT UNIQUE,
+            description TEXT,
+            html_content TEXT,
+            source_document TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+
+def get_connection() -> sqlite3.Connection:
+    """This thread's connection to tables.db, opened and tuned on first use"""
+    conn: Optional[sqlite3.Connection] = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(
+            tables_db_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            cached_statements=CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row
+        _configure(conn)
+        _local.conn = conn
+        logger.info(f"Opened {tables_db_path} (WAL) for thread {threading.current_thread().name}")
+    return conn
+
+
+@contextmanager
+def transaction() -> Iterator[sqlite3.Cursor]:
+    """Cursor whose writes commit together, or roll back if the block raises"""
+    conn = get_connection()
+    with conn:
+        yield conn.cursor()
@@ -1,26 +1,22 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_chroma import Chroma
-from typing import Optional
-import torch
+from typing import Optional, TYPE_CHECKING
+from chatbot.utilise.embedding_helper import get_embeddings
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
 
 # Singleton pattern for text vector store
-_text_vector_store: Optional[Chroma] = None
+_text_vector_store: Optional["Chroma"] = None
 
-def get_text_vector_store() -> Chroma:
+def get_text_vector_store() -> "Chroma":
     """Get or initialize the persistent text vector store"""
     global _text_vector_store
     if _text_vector_store is None:
         try:
-            # Initialize with explicit device mapping
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            embeddings = HuggingFaceEmbeddings(
-                model_name="all-MiniLM-L6-v2",
-                model_kwargs={'device': device}
-            )
-            
+            # Imported here so importing the chatbot does not load chromadb
+            from langchain_chroma import Chroma
             _text_vector_store = Chroma(
                 collection_name="text_chunks",
-                embedding_function=embeddings,
+                embedding_function=get_embeddings(),
                 persist_directory="text_vector_store"
             )
         except Exception as e:
@@ -30,4 +26,4 @@ def get_text_vector_store() -> Chroma:
 
 def get_text_retriever():
     """Get the retriever from the text vector store"""
-    return get_text_vector_store().as_retriever()
\ No newline at end of file
+    return get_text_vector_store().as_retriever()
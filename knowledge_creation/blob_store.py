@@ -0,0 +1,357 @@
+"""Content-addressed packed blob store.
+
+Blobs (images, JSON metadata) are appended to large segment files and
+located through a SQLite offset index keyed by SHA-256, instead of one file
+per blob. Reads map segments with mmap and return zero-copy memoryviews.
+Deleted blobs are reclaimed by compaction, which rewrites live blobs into a
+fresh segment.
+
+References look like ``blob://<sha256>``. Legacy plain file paths are still
+resolved from disk so older vector store metadata keeps working.
+
+Usage: python -m knowledge_creation.blob_store {stats,gc,compact}
+"""
+from typing import Dict, Any, List, Optional, Tuple, Union
+import argparse
+import fcntl
+import hashlib
+import io
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from PIL import Image
+
+blob_store_dir = os.getenv("BLOB_STORE_DIR", "./blob_store")
+# Start a new segment once the active one reaches this size
+blob_segment_bytes = int(os.getenv("BLOB_SEGMENT_BYTES", str(256 * 1024 ** 2)))
+
+REF_PREFIX = "blob://"
+# Segments with more dead bytes than this fraction are rewritten by compaction
+COMPACT_DEAD_RATIO = 0.3
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_maps: Dict[int, Tuple[mmap.mmap, int]] = {}
+_maps_lock = threading.Lock()
+
+
+def _index() -> sqlite3.Connection:
+    """Per-thread connection to the offset index"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(blob_store_dir, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(blob_store_dir, "index.db"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                segment INTEGER,
+                offset INTEGER,
+                length INTEGER,
+                mime_type TEXT,
+                deleted INTEGER DEFAULT 0,
+                created_at REAL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_segment ON blobs (segment)")
+        _local.conn = conn
+    return conn
+
+
+def _segment_path(segment: int) -> str:
+    return os.path.join(blob_store_dir, f"segment_{segment:06d}.pack")
+
+
+class _ExclusiveWriter:
+    """Serialize appends across threads (lock) and processes (flock)"""
+
+    def __enter__(self):
+        _write_lock.acquire()
+        os.makedirs(blob_store_dir, exist_ok=True)
+        self.lock_file = open(os.path.join(blob_store_dir, "write.lock"), "w")
+        fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+        self.lock_file.close()
+        _write_lock.release()
+
+
+def _active_segment(conn: sqlite3.Connection) -> int:
+    segment = conn.execute("SELECT MAX(segment) FROM blobs").fetchone()[0] or 1
+    path = _segment_path(segment)
+    if os.path.exists(path) and os.path.getsize(path) >= blob_segment_bytes:
+        segment += 1
+    return segment
+
+
+def to_ref(sha256: str) -> str:
+    return f"{REF_PREFIX}{sha256}"
+
+
+def put_many(items: List[Tuple[bytes, str]]) -> List[Dict[str, Any]]:
+    """Append (data, mime_type) blobs in one segment write and one index transaction"""
+    if not items:
+        return []
+    hashed = [(hashlib.sha256(data).hexdigest(), data, mime_type) for data, mime_type in items]
+    conn = _index()
+
+    with _ExclusiveWriter():
+        shas = list({sha256 for sha256, _, _ in hashed})
+        placeholders = ",".join("?" * len(shas))
+        live = {
+            row[0] for row in conn.execute(
+                f"SELECT sha256 FROM blobs WHERE deleted = 0 AND sha256 IN ({placeholders})", shas
+            )
+        } if shas else set()
+
+        rows = []
+        segment = _active_segment(conn)
+        with open(_segment_path(segment), "ab") as f:
+            offset = f.tell()
+            for sha256, data, mime_type in hashed:
+                # Content-addressed: identical bytes are stored once
+                if sha256 in live:
+                    continue
+                f.write(data)
+                rows.append((sha256, segment, offset, len(data), mime_type, time.time()))
+                live.add(sha256)
+                offset += len(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO blobs (sha256, segment, offset, length, mime_type, deleted, created_at) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?)",
+            rows
+        )
+        conn.commit()
+
+    return [
+        {"sha256": sha256, "path": to_ref(sha256), "mime_type": mime_type, "bytes": len(data)}
+        for sha256, data, mime_type in hashed
+    ]
+
+
+def put_blob(data: bytes, mime_type: str) -> Dict[str, Any]:
+    """Store bytes once under their SHA-256 and return a reference to them"""
+    return put_many([(data, mime_type)])[0]
+
+
+def put_json(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Store a JSON record compactly and return its reference"""
+    return put_json_many([record])[0]
+
+
+def put_json_many(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Store many JSON records in a single batch write"""
+    return put_many([
+        (json.dumps(record, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8"), "application/json")
+        for record in records
+    ])
+
+
+def image_size(data: bytes) -> Tuple[int, int]:
+    """(width, height) from the image header; raises if the bytes are not a readable image"""
+    # Image.open only parses the header here, the pixels are never decoded
+    return Image.open(io.BytesIO(data)).size
+
+
+def put_images(items: List[Tuple[bytes, str]]) -> List[Dict[str, Any]]:
+    """Store (data, mime_type) images in one batch and return references with dimensions
+
+    Width and height are None for bytes whose header PIL cannot read, so one
+    odd image is still stored instead of failing the batch.
+    """
+    sizes = []
+    for data, _ in items:
+        try:
+            sizes.append(image_size(data))
+        except Exception:
+            sizes.append((None, None))
+    return [
+        {**ref, "width": width, "height": height}
+        for ref, (width, height) in zip(put_many(items), sizes)
+    ]
+
+
+def put_image(data: bytes, mime_type: str = "image/png") -> Dict[str, Any]:
+    """Store an image and return a compact reference with its dimensions"""
+    return put_images([(data, mime_type)])[0]
+
+
+def _segment_map(segment: int, needed_end: int) -> mmap.mmap:
+    """Read-only map of a segment, remapped if the active segment grew past it"""
+    with _maps_lock:
+        cached = _maps.get(segment)
+        if cached is None or cached[1] < needed_end:
+            # The old map is not closed: memoryviews handed out earlier may still use it
+            with open(_segment_path(segment), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            _maps[segment] = (mapped, size)
+        return _maps[segment][0]
+
+
+def _sha_from(ref: Union[str, Dict[str, Any]]) -> str:
+    value = ref["path"] if isinstance(ref, dict) else ref
+    return value[len(REF_PREFIX):] if value.startswith(REF_PREFIX) else value
+
+
+def read_blob(ref: Union[str, Dict[str, Any]]) -> memoryview:
+    """Zero-copy view of a blob's bytes inside its memory-mapped segment"""
+    sha256 = _sha_from(ref)
+    row = _index().execute(
+        "SELECT segment, offset, length FROM blobs WHERE sha256 = ? AND deleted = 0", (sha256,)
+    ).fetchone()
+    if row is None:
+        raise KeyError(f"Blob not found: {sha256}")
+
+    segment, offset, length = row
+    return memoryview(_segment_map(segment, offset + length))[offset:offset + length]
+
+
+def get_blob(ref: Union[str, Dict[str, Any]]) -> bytes:
+    """Load a blob's bytes (copied), accepting blob:// refs or legacy file paths"""
+    value = ref["path"] if isinstance(ref, dict) else ref
+    if not value.startswith(REF_PREFIX):
+        with open(value, "rb") as f:
+            return f.read()
+    return bytes(read_blob(value))
+
+
+def blob_exists(ref: Union[str, Dict[str, Any]]) -> bool:
+    """Whether a blob:// reference points at a live blob"""
+    row = _index().execute(
+        "SELECT 1 FROM blobs WHERE sha256 = ? AND deleted = 0", (_sha_from(ref),)
+    ).fetchone()
+    return row is not None
+
+
+def load_json(ref: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Resolve a JSON metadata reference (blob:// or legacy file path)"""
+    return json.loads(get_blob(ref))
+
+
+def delete_blobs(shas: List[str]) -> int:
+    """Mark blobs deleted; their bytes are reclaimed by compact()"""
+    if not shas:
+        return 0
+    conn = _index()
+    with _ExclusiveWriter():
+        cursor = conn.executemany(
+            "UPDATE blobs SET deleted = 1 WHERE sha256 = ? AND deleted = 0", [(sha,) for sha in shas]
+        )
+        conn.commit()
+        return cursor.rowcount
+
+
+def stats() -> Dict[str, Any]:
+    """Blob counts and live/dead bytes per segment"""
+    conn = _index()
+    segments = {}
+    for segment, deleted, count, total in conn.execute(
+        "SELECT segment, deleted, COUNT(*), SUM(length) FROM blobs GROUP BY segment, deleted"
+    ):
+        entry = segments.setdefault(segment, {"live_blobs": 0, "live_bytes": 0, "dead_bytes": 0})
+        if deleted:
+            entry["dead_bytes"] += total
+        else:
+            entry["live_blobs"] += count
+            entry["live_bytes"] += total
+    return segments
+
+
+def compact(dead_ratio: float = COMPACT_DEAD_RATIO) -> int:
+    """Rewrite live blobs out of segments that are mostly dead, then delete those segments"""
+    conn = _index()
+    reclaimed = 0
+
+    with _ExclusiveWriter():
+        active = _active_segment(conn)
+        victims = [
+            segment for segment, entry in stats().items()
+            if segment != active and entry["dead_bytes"] > dead_ratio * (entry["live_bytes"] + entry["dead_bytes"])
+        ]
+
+        for segment in victims:
+            live = conn.execute(
+                "SELECT sha256, offset, length FROM blobs WHERE segment = ? AND deleted = 0 ORDER BY offset",
+                (segment,)
+            ).fetchall()
+            rows = []
+            with open(_segment_path(segment), "rb") as src, open(_segment_path(active), "ab") as dst:
+                offset = dst.tell()
+                for sha256, old_offset, length in live:
+                    src.seek(old_offset)
+                    dst.write(src.read(length))
+                    rows.append((active, offset, sha256))
+                    offset += length
+                dst.flush()
+                os.fsync(dst.fileno())
+
+            conn.executemany("UPDATE blobs SET segment = ?, offset = ? WHERE sha256 = ?", rows)
+            conn.execute("DELETE FROM blobs WHERE segment = ? AND deleted = 1", (segment,))
+            conn.commit()
+
+            with _maps_lock:
+                _maps.pop(segment, None)
+            reclaimed += os.path.getsize(_segment_path(segment))
+            os.remove(_segment_path(segment))
+
+    return reclaimed
+
+
+def referenced_blob_shas() -> set:
+    """SHA-256s referenced from the vector store metadata or reusable through the image index"""
+    from chatbot.utilise.text_helper import get_text_vector_store
+    from chatbot.utilise.image_helper import get_image_vector_store
+    from knowledge_creation import image_index
+
+    # Images described earlier stay reusable by later documents after a gc
+    shas = image_index.referenced_blob_shas()
+    for store in (get_text_vector_store(), get_image_vector_store()):
+        for metadata in store.get(include=["metadatas"])["metadatas"]:
+            for field in ("image_path", "thumbnail_path", "original_path", "metadata_path", "json_path"):
+                value = metadata.get(field)
+                if isinstance(value, str) and value.startswith(REF_PREFIX):
+                    shas.add(value[len(REF_PREFIX):])
+    return shas
+
+
+def collect_garbage() -> int:
+    """Mark every blob neither the vector stores nor the image index reference as deleted"""
+    live = referenced_blob_shas()
+    stored = [row[0] for row in _index().execute("SELECT sha256 FROM blobs WHERE deleted = 0")]
+    return delete_blobs([sha for sha in stored if sha not in live])
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Inspect and maintain the packed blob store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show live and dead bytes per segment")
+    subparsers.add_parser("gc", help="Mark blobs no longer referenced by the vector stores or image index as deleted")
+    compact_parser = subparsers.add_parser("compact", help="Reclaim space from deleted blobs")
+    compact_parser.add_argument("--dead-ratio", type=float, default=COMPACT_DEAD_RATIO)
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        segments = stats()
+        print(f"📦 Blob store: {blob_store_dir}")
+        for segment, entry in sorted(segments.items()):
+            print(
+                f"   segment {segment}: {entry['live_blobs']} blobs, "
+                f"{entry['live_bytes'] / 1024 ** 2:.1f} MB live, {entry['dead_bytes'] / 1024 ** 2:.1f} MB dead"
+            )
+    elif args.command == "gc":
+        print(f"🗑️ Marked {collect_garbage()} unreferenced blobs as deleted")
+    elif args.command == "compact":
+        print(f"🗜️ Reclaimed {compact(args.dead_ratio) / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
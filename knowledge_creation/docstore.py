@@ -0,0 +1,160 @@
+from typing import Dict, Any, List, Optional, Tuple
+import os
+import sqlite3
+import time
+
+docstore_path = os.getenv("DOCSTORE_PATH", "docstore.db")
+
+CHUNK_COLUMNS = "chunk_id, source_document, page_number, chunk_index, element_type, text, word_count, char_count"
+QUALIFIED_CHUNK_COLUMNS = ", ".join(f"text_chunks.{column.strip()}" for column in CHUNK_COLUMNS.split(","))
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(docstore_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS text_chunks (
+            chunk_id TEXT PRIMARY KEY,
+            source_document TEXT,
+            page_number INTEGER,
+            chunk_index INTEGER,
+            element_type TEXT,
+            text TEXT,
+            word_count INTEGER,
+            char_count INTEGER,
+            ingested_at REAL
+        )
+    ''')
+    # Last write by any store node (text, images, tables), so image- or table-only
+    # documents also change the corpus fingerprint
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS document_stamps (
+            source_document TEXT PRIMARY KEY,
+            ingested_at REAL
+        )
+    ''')
+    # Document order is (page_number, chunk_index): chunk_index restarts per streamed window
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_text_chunks_position
+        ON text_chunks (source_document, page_number, chunk_index)
+    ''')
+    return conn
+
+
+def _prune(conn: sqlite3.Connection, source_document: str, keep_ids: List[str]) -> int:
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_ids (chunk_id TEXT PRIMARY KEY)")
+    conn.execute("DELETE FROM keep_ids")
+    conn.executemany("INSERT OR IGNORE INTO keep_ids VALUES (?)", [(chunk_id,) for chunk_id in keep_ids])
+    cursor = conn.execute(
+        "DELETE FROM text_chunks WHERE source_document = ? AND chunk_id NOT IN (SELECT chunk_id FROM keep_ids)",
+        (source_document,)
+    )
+    return cursor.rowcount
+
+
+def write_document_chunks(source_document: str, chunks: List[Dict[str, Any]], prune: bool = True) -> int:
+    """Upsert a document's chunks in a single transaction, optionally dropping removed ones"""
+    now = time.time()
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO text_chunks ({CHUNK_COLUMNS}, ingested_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        chunk["chunk_id"], source_document, chunk.get("page_number") or 0, chunk["index"],
+                        chunk["element_type"], chunk["text"], chunk["word_count"], chunk["char_count"], now
+                    )
+                    for chunk in chunks
+                ]
+            )
+            # An empty chunk list usually means parsing failed, so it never prunes
+            removed = _prune(conn, source_document, [chunk["chunk_id"] for chunk in chunks]) if prune and chunks else 0
+            conn.execute(
+                "INSERT OR REPLACE INTO document_stamps (source_document, ingested_at) VALUES (?, ?)",
+                (source_document, now)
+            )
+        return removed
+    finally:
+        conn.close()
+
+
+def prune_chunks(source_document: str, keep_ids: List[str]) -> int:
+    """Delete a document's chunks whose IDs are not in keep_ids"""
+    if not keep_ids:
+        return 0
+    conn = _connect()
+    try:
+        with conn:
+            return _prune(conn, source_document, keep_ids)
+    finally:
+        conn.close()
+
+
+def get_chunk(chunk_id: str) -> Optional[Dict[str, Any]]:
+    """Primary-key lookup of a single chunk"""
+    conn = _connect()
+    try:
+        row = conn.execute(f"SELECT {CHUNK_COLUMNS} FROM text_chunks WHERE chunk_id = ?", (chunk_id,)).fetchone()
+        return dict(row) if row else None
+    finally:
+        conn.close()
+
+
+def get_neighbouring_chunks(chunk_id: str, window: int = 1) -> List[Dict[str, Any]]:
+    """The chunk plus up to `window` chunks before and after it, in document order, in one query"""
+    conn = _connect()
+    try:
+        rows = conn.execute(f'''
+            WITH anchor AS (
+                SELECT source_document, page_number, chunk_index FROM text_chunks WHERE chunk_id = :chunk_id
+            )
+            SELECT * FROM (
+                SELECT {QUALIFIED_CHUNK_COLUMNS} FROM text_chunks, anchor
+                WHERE text_chunks.source_document = anchor.source_document
+                  AND (text_chunks.page_number, text_chunks.chunk_index) < (anchor.page_number, anchor.chunk_index)
+                ORDER BY text_chunks.page_number DESC, text_chunks.chunk_index DESC
+                LIMIT :window
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT {QUALIFIED_CHUNK_COLUMNS} FROM text_chunks, anchor
+                WHERE text_chunks.source_document = anchor.source_document
+                  AND (text_chunks.page_number, text_chunks.chunk_index) >= (anchor.page_number, anchor.chunk_index)
+                ORDER BY text_chunks.page_number, text_chunks.chunk_index
+                LIMIT :window + 1
+            )
+        ''', {"chunk_id": chunk_id, "window": window}).fetchall()
+        return sorted((dict(row) for row in rows), key=lambda row: (row["page_number"], row["chunk_index"]))
+    finally:
+        conn.close()
+
+
+def mark_ingested(source_document: str) -> None:
+    """Record that a store node just wrote (or removed) data for the document"""
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO document_stamps (source_document, ingested_at) VALUES (?, ?)",
+                (source_document, time.time())
+            )
+    finally:
+        conn.close()
+
+
+def corpus_fingerprint() -> Tuple[int, int, float, int, float]:
+    """(documents with text, chunks, latest chunk write, stamped documents, latest stamp).
+
+    Changes whenever any document is (re)ingested, including documents with
+    only images or tables.
+    """
+    conn = _connect()
+    try:
+        chunks = conn.execute(
+            "SELECT COUNT(DISTINCT source_document), COUNT(*), COALESCE(MAX(ingested_at), 0) FROM text_chunks"
+        ).fetchone()
+        stamps = conn.execute("SELECT COUNT(*), COALESCE(MAX(ingested_at), 0) FROM document_stamps").fetchone()
+        return (*tuple(chunks), *tuple(stamps))
+    finally:
+        conn.close()
@@ -0,0 +1,28 @@
+import hashlib
+from typing import List, Sequence
+
+
+def stable_id(prefix: str, *parts) -> str:
+    """Content-derived ID that is identical across processes and runs.
+
+    Unlike hash(), SHA-256 is not salted per process, so the same content
+    always maps to the same ID.
+    """
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f"{prefix}_{digest[:32]}"
+
+
+def assign_stable_ids(prefix: str, keys: Sequence[Sequence]) -> List[str]:
+    """IDs for a list of content keys, numbering repeats of an identical key.
+
+    A chunk repeated verbatim on the same page (boilerplate, headers) gets
+    the ordinal of its occurrence so both copies keep distinct IDs.
+    """
+    seen = {}
+    ids = []
+    for key in keys:
+        base = stable_id(prefix, *key)
+        ordinal = seen.get(base, 0)
+        seen[base] = ordinal + 1
+        ids.append(base if ordinal == 0 else stable_id(prefix, *key, ordinal))
+    return ids
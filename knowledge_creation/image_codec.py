@@ -0,0 +1,79 @@
+"""Re-encoding of extracted images before they reach the blob store.
+
+partition_pdf emits full-resolution PNG crops. Images are downscaled to a
+maximum edge and re-encoded as WebP or JPEG, and a small thumbnail is
+generated for display. The untouched original is only kept on request.
+"""
+from typing import Dict, Tuple
+import io
+import os
+from PIL import Image
+
+# webp, jpeg, or original to store what the parser emitted
+image_format = os.getenv("IMAGE_FORMAT", "webp").lower()
+image_max_edge = int(os.getenv("IMAGE_MAX_EDGE", "1600"))
+image_quality = int(os.getenv("IMAGE_QUALITY", "80"))
+# 0 disables thumbnails
+image_thumbnail_edge = int(os.getenv("IMAGE_THUMBNAIL_EDGE", "256"))
+image_keep_original = os.getenv("IMAGE_KEEP_ORIGINAL", "0") == "1"
+
+MIME_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+THUMBNAIL_QUALITY = 70
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    if fmt == "jpeg":
+        if _has_alpha(image):
+            # JPEG has no alpha channel, flatten onto white like a PDF page
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            image = image.convert("RGB")
+        save_kwargs = {"quality": quality, "optimize": True}
+    else:
+        image = image.convert("RGBA" if _has_alpha(image) else "RGB")
+        save_kwargs = {"quality": quality, "method": 4}
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), **save_kwargs)
+    return buffer.getvalue()
+
+
+def _fit(image: Image.Image, max_edge: int) -> Image.Image:
+    if max_edge <= 0 or max(image.size) <= max_edge:
+        return image
+    image = image.copy()
+    image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    return image
+
+
+def encode_for_storage(data: bytes, mime_type: str) -> Dict[str, Tuple[bytes, str]]:
+    """The (data, mime_type) variants to store for one image: image, thumbnail and original"""
+    variants = {"image": (data, mime_type)}
+    fmt = image_format if image_format in MIME_TYPES else None
+    thumbnail_fmt = fmt or "webp"
+
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+
+        if fmt:
+            resized = _fit(image, image_max_edge)
+            encoded = _encode(resized, fmt, image_quality)
+            # A tiny PNG can beat the lossy encoding; keep it unless it had to be downscaled
+            if len(encoded) < len(data) or resized is not image:
+                variants["image"] = (encoded, MIME_TYPES[fmt])
+                if image_keep_original:
+                    variants["original"] = (data, mime_type)
+
+        if image_thumbnail_edge > 0 and max(image.size) > image_thumbnail_edge:
+            variants["thumbnail"] = (
+                _encode(_fit(image, image_thumbnail_edge), thumbnail_fmt, THUMBNAIL_QUALITY),
+                MIME_TYPES[thumbnail_fmt]
+            )
+
+    return variants
@@ -0,0 +1,151 @@
+"""Corpus-wide index of described images, keyed by content hash and dHash.
+
+Lets the dedup stage find an image that was already described, in this or
+any earlier document, by exact SHA-256 or by a perceptual hash within a
+Hamming distance. The 64-bit dHash is also stored as eight 8-bit bands: two
+hashes within distance 7 share at least one band, so those lookups only
+scan candidates from the band indexes.
+"""
+from typing import Dict, Any, List, Optional
+import json
+import os
+import sqlite3
+import time
+
+image_index_path = os.getenv("IMAGE_INDEX_PATH", "image_index.db")
+
+BAND_BITS = 8
+BAND_COUNT = 8
+BAND_COLUMNS = [f"band{band}" for band in range(BAND_COUNT)]
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(image_index_path, timeout=30)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS images (
+            sha256 TEXT PRIMARY KEY,
+            dhash TEXT,
+            {", ".join(f"{column} INTEGER" for column in BAND_COLUMNS)},
+            image_ref TEXT,
+            description TEXT,
+            prompt_version TEXT,
+            updated_at REAL,
+            variant_refs TEXT,
+            prompt_input TEXT
+        )
+    ''')
+    # Indexes created before these columns existed only know the main image and description
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(images)")}
+    for column in ("variant_refs", "prompt_input"):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE images ADD COLUMN {column} TEXT")
+    for column in BAND_COLUMNS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_images_{column} ON images ({column})")
+    return conn
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def hash_bands(dhash: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [(dhash >> (band * BAND_BITS)) & mask for band in range(BAND_COUNT)]
+
+
+def _entry(row) -> Dict[str, Any]:
+    return {
+        "sha256": row[0],
+        "dhash": int(row[1], 16),
+        "image_ref": json.loads(row[2]),
+        "description": row[3],
+        # Every stored variant ({"image_ref": ..., "thumbnail_ref": ...}); None for older entries
+        "variant_refs": json.loads(row[4]) if row[4] else None,
+        # Hash of the caption and image text the description was generated from
+        "prompt_input": row[5],
+    }
+
+
+def find_described_image(sha256: str, dhash: Optional[int], prompt_version: str,
+                         max_distance: int, accept=None) -> Optional[Dict[str, Any]]:
+    """Closest described image: an exact byte match first, then the nearest dHash.
+
+    `accept` can veto a near match (e.g. a different aspect ratio or caption).
+    """
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT sha256, dhash, image_ref, description, variant_refs, prompt_input FROM images "
+            "WHERE sha256 = ? AND prompt_version = ?",
+            (sha256, prompt_version)
+        ).fetchone()
+        if row:
+            return {**_entry(row), "distance": 0}
+        if dhash is None or max_distance <= 0:
+            return None
+
+        query = (
+            "SELECT sha256, dhash, image_ref, description, variant_refs, prompt_input FROM images "
+            "WHERE prompt_version = ?"
+        )
+        params: List[Any] = [prompt_version]
+        if max_distance < BAND_COUNT:
+            query += " AND (" + " OR ".join(f"{column} = ?" for column in BAND_COLUMNS) + ")"
+            params.extend(hash_bands(dhash))
+
+        best = None
+        for row in conn.execute(query, params):
+            entry = _entry(row)
+            entry["distance"] = hamming_distance(dhash, entry["dhash"])
+            if entry["distance"] > max_distance or (accept and not accept(entry)):
+                continue
+            if best is None or entry["distance"] < best["distance"]:
+                best = entry
+        return best
+    finally:
+        conn.close()
+
+
+def variant_refs(image: Dict[str, Any]) -> Dict[str, Any]:
+    """All blob references of an image: image_ref plus thumbnail_ref, original_ref, ..."""
+    return {key: value for key, value in image.items() if key.endswith("_ref") and value}
+
+
+def record_described_images(images: List[Dict[str, Any]], prompt_version: str):
+    """Remember descriptions for images carrying an image_ref and dhash (plus their prompt_input hash)"""
+    rows = [
+        (
+            image["image_ref"]["sha256"], format(image["dhash"], "016x"), *hash_bands(image["dhash"]),
+            json.dumps(image["image_ref"]), image["description"], prompt_version, time.time(),
+            json.dumps(variant_refs(image)), image.get("prompt_input")
+        )
+        for image in images
+        if image.get("dhash") is not None
+    ]
+    if not rows:
+        return
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO images (sha256, dhash, {', '.join(BAND_COLUMNS)}, image_ref, "
+                f"description, prompt_version, updated_at, variant_refs, prompt_input) "
+                f"VALUES ({', '.join('?' * (BAND_COUNT + 8))})",
+                rows
+            )
+    finally:
+        conn.close()
+
+
+def referenced_blob_shas() -> set:
+    """Blob SHA-256s the index can hand out for reuse (kept alive by blob_store gc)"""
+    shas = set()
+    conn = _connect()
+    try:
+        for image_ref, refs in conn.execute("SELECT image_ref, variant_refs FROM images"):
+            for ref in [json.loads(image_ref), *(json.loads(refs).values() if refs else [])]:
+                if ref and ref.get("sha256"):
+                    shas.add(ref["sha256"])
+    finally:
+        conn.close()
+    return shas
@@ -1,9 +1,10 @@
 from typing import Dict, Any
-import os
-import base64
-import json
 from orchestration.states import DocumentProcessingState
+from knowledge_creation.blob_store import put_json_many
+from knowledge_creation.docstore import mark_ingested
 from chatbot.utilise.image_helper import get_image_vector_store
+from knowledge_creation.ids import assign_stable_ids, stable_id
+from knowledge_creation.vector_sync import sync_vector_store
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 import logging
 
@@ -15,6 +16,7 @@ def store_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
     """Store images with robust error handling"""
     logger.info("Starting image storage process")
     storage_status = []
+    chunk_ids = []
     
     try:
         # Initialize vector store
@@ -24,8 +26,6 @@ def store_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
             logger.error(f"Vector store initialization failed: {str(e)}")
             raise
         
-        # Create storage directory
-        os.makedirs("./stored_images", exist_ok=True)
         text_splitter = RecursiveCharacterTextSplitter.from_tiktoken_encoder(
             chunk_size=500,
             chunk_overlap=0
@@ -33,42 +33,58 @@ def store_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
         
         texts = []
         metadatas = []
+        image_ids = assign_stable_ids("image", [
+            (image_data["source_document"], image_data.get("page_number"), image_data["image_ref"]["sha256"])
+            for image_data in state["processed_images"]
+        ])
 
-        for i, image_data in enumerate(state["processed_images"]):
+        # Image bytes were packed by extract_images_node; pack all metadata records in one batch.
+        # processed_at stays out of the record so unchanged images map to the same blob.
+        metadata_refs = put_json_many([
+            {
+                "image_path": image_data["image_ref"]["path"],
+                "image_sha256": image_data["image_ref"]["sha256"],
+                "mime_type": image_data["image_ref"]["mime_type"],
+                "thumbnail_path": image_data.get("thumbnail_ref", {}).get("path"),
+                "original_path": image_data.get("original_ref", {}).get("path"),
+                "width": image_data["image_ref"]["width"],
+                "height": image_data["image_ref"]["height"],
+                "caption": image_data["caption"],
+                "description": image_data["description"],
+                "source_document": image_data["source_document"],
+                "occurrences": image_data.get("occurrences", [])
+            }
+            for image_data in state["processed_images"]
+        ])
+
+        for i, (image_id, image_data, metadata_ref) in enumerate(
+            zip(image_ids, state["processed_images"], metadata_refs)
+        ):
             try:
-                # Store image file
-                image_binary = base64.b64decode(image_data["base64_image"])
-                image_filename = f"image_{image_data['index']}_{i}.png"
-                image_path = os.path.join("./stored_images", image_filename)
-                
-                with open(image_path, "wb") as f:
-                    f.write(image_binary)
-                
-                # Store metadata
-                metadata = {
-                    "image_path": image_path,
-                    "caption": image_data["caption"],
-                    "description": image_data["description"],
-                    "source_document": image_data["source_document"],
-                    "processed_at": image_data["processed_at"]
-                }
-                
-                metadata_filename = f"image_metadata_{image_data['index']}_{i}.json"
-                metadata_path = os.path.join("./stored_images", metadata_filename)
-                
-                with open(metadata_path, "w") as f:
-                    json.dump(metadata, f, indent=2)
+                image_path = image_data["image_ref"]["path"]
+                metadata_path = metadata_ref["path"]
                 
                 # Prepare text for vector storage
                 combined_text = f"Caption: {image_data['caption']}\nDescription: {image_data['description']}"
                 splits = text_splitter.split_text(combined_text)
                 
-                for split in splits:
+                for split_idx, split in enumerate(splits):
+                    # Derived from the text too, so a changed description gets a new ID
+                    chunk_ids.append(stable_id("imgtxt", image_id, split_idx, split))
                     texts.append(split)
                     metadatas.append({
+                        "image_id": image_id,
                         "image_path": image_path,
+                        # Small pre-rendered copy for display; empty when the image is already small
+                        "thumbnail_path": image_data.get("thumbnail_ref", {}).get("path", ""),
+                        "original_path": image_data.get("original_ref", {}).get("path", ""),
                         "metadata_path": metadata_path,
                         "source_document": image_data["source_document"],
+                        # Every page the image appears on (Chroma metadata cannot hold lists)
+                        "pages": ",".join(
+                            str(item["page_number"]) for item in image_data.get("occurrences", [])
+                            if item.get("page_number") is not None
+                        ),
                         "processed_at": image_data["processed_at"]
                     })
                 
@@ -76,16 +92,23 @@ def store_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
                 logger.error(f"Error processing image {i}: {str(e)}")
                 continue
 
-        # Store in vector database
-        if texts:
-            try:
-                vector_store.add_texts(texts=texts, metadatas=metadatas)
-                storage_status.append(f"Images: Stored {len(texts)} description chunks")
-                logger.info(f"Successfully stored {len(texts)} text chunks")
-            except Exception as e:
-                logger.error(f"Failed to store texts: {str(e)}")
-                raise
+        # Upsert by chunk ID so re-ingestion only embeds new chunks and drops removed ones
+        try:
+            sync = sync_vector_store(
+                vector_store, state["document_path"], chunk_ids, texts, metadatas,
+                prune=state.get("prune_stale", True)
+            )
+            storage_status.append(
+                f"Images: Stored {len(texts)} description chunks "
+                f"({sync['added']} new, {sync['unchanged']} unchanged, {sync['deleted']} removed)"
+            )
+            logger.info(f"Successfully stored {len(texts)} text chunks")
+        except Exception as e:
+            logger.error(f"Failed to store texts: {str(e)}")
+            raise
         
+        # Image-only documents must still invalidate cached chatbot answers
+        mark_ingested(state["document_path"])
         storage_status.append(f"Images: Stored {len(state['processed_images'])} images")
         logger.info("Image storage completed successfully")
 
@@ -94,4 +117,7 @@ def store_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
         logger.error(error_msg)
         storage_status.append(error_msg)
 
-    return {"storage_status": storage_status}
\ No newline at end of file
+    return {
+        "storage_status": storage_status,
+        "ingestion_report": [{"stage": "store_images", "ids": chunk_ids}]
+    }
\ No newline at end of file
@@ -1,35 +1,96 @@
-from typing import Dict, Any
-import sqlite3
+from typing import Dict, Any, List
 from orchestration.states import DocumentProcessingState
+from chatbot.utilise.sql_helper import transaction
+from knowledge_creation.docstore import mark_ingested
+from knowledge_creation.ids import assign_stable_ids
+from knowledge_creation.table_materializer import drop_materialized, materialize_table
+from knowledge_creation.table_search import index_tables, remove_from_table_index
+
+
+def prune_tables(cursor, source_document: str, keep_ids: List[str]) -> int:
+    """Delete a document's tables whose IDs are not in keep_ids"""
+    if not keep_ids:
+        return 0
+    placeholders = ",".join("?" * len(keep_ids))
+    stale = [
+        row[0] for row in cursor.execute(
+            f"SELECT table_id FROM table_metadata WHERE source_document = ? AND table_id NOT IN ({placeholders})",
+            (source_document, *keep_ids)
+        ).fetchall()
+    ]
+    drop_materialized(cursor, stale)
+    remove_from_table_index(cursor, stale)
+    cursor.executemany("DELETE FROM table_metadata WHERE table_id = ?", [(table_id,) for table_id in stale])
+    return len(stale)
+
 
 def store_tables_node(state: DocumentProcessingState) -> Dict[str, Any]:
     """Store tables in SQL database"""
     
     print("🗄️ Storing tables in SQL database...")
+    table_ids = []
+    materialized = 0
     
     try:
-        conn = sqlite3.connect('tables.db')
-        cursor = conn.cursor()
+        # SHA-256 content IDs instead of hash(), which is salted per process
+        table_ids = assign_stable_ids("table", [
+            (table_data["source_document"], table_data.get("page_number"), table_data["table_as_html"])
+            for table_data in state["processed_tables"]
+        ])
         
-        for table_data in state["processed_tables"]:
-            table_id = f"table_{table_data['index']}_{hash(table_data['source_document'])}"
-            
-            # Insert or update table metadata
-            cursor.execute('''
+        # One transaction on the shared WAL connection for the whole document
+        with transaction() as cursor:
+            # Insert or update table metadata in one batch
+            cursor.executemany('''
                 INSERT OR REPLACE INTO table_metadata 
                 (table_id, description, html_content, source_document)
                 VALUES (?, ?, ?, ?)
-            ''', (
-                table_id,
-                table_data["description"],
-                table_data["table_as_html"],
-                table_data["source_document"]
-            ))
-        
-        conn.commit()
-        conn.close()
+            ''', [
+                (
+                    table_id,
+                    table_data["description"],
+                    table_data["table_as_html"],
+                    table_data["source_document"]
+                )
+                for table_id, table_data in zip(table_ids, state["processed_tables"])
+            ])
+            
+            # Typed copy the table agent can aggregate and filter with SQL;
+            # a table that fails to materialize is rolled back on its own
+            for table_id, table_data in zip(table_ids, state["processed_tables"]):
+                cursor.execute("SAVEPOINT materialize_table")
+                try:
+                    if materialize_table(cursor, table_id, table_data):
+                        materialized += 1
+                    cursor.execute("RELEASE materialize_table")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO materialize_table")
+                    cursor.execute("RELEASE materialize_table")
+                    print(f"⚠️ Could not materialize table {table_id}: {e}")
+            
+            # Refresh the full-text index for every stored table in one batch
+            index_tables(cursor, [
+                {
+                    "table_id": table_id,
+                    "description": table_data["description"],
+                    "table_text": table_data.get("table_text"),
+                    "source_document": table_data["source_document"]
+                }
+                for table_id, table_data in zip(table_ids, state["processed_tables"])
+            ])
+            
+            # Drop tables that no longer exist in this version of the document
+            removed = 0
+            if state.get("prune_stale", True):
+                removed = prune_tables(cursor, state["document_path"], table_ids)
         
-        storage_status = f"Tables: Successfully stored {len(state['processed_tables'])} tables in SQL database"
+        mark_ingested(state["document_path"])
+        if removed:
+            print(f"🗑️ Removed {removed} tables no longer present in the document")
+        storage_status = (
+            f"Tables: Successfully stored {len(state['processed_tables'])} tables in SQL database "
+            f"({materialized} materialized as queryable tables)"
+        )
         
     except Exception as e:
         storage_status = f"Tables: Error storing tables - {str(e)}"
@@ -37,4 +98,7 @@ def store_tables_node(state: DocumentProcessingState) -> Dict[str, Any]:
     
     print(f"✅ {storage_status}")
     
-    return {"storage_status": [storage_status]}
+    return {
+        "storage_status": [storage_status],
+        "ingestion_report": [{"stage": "store_tables", "ids": table_ids}]
+    }
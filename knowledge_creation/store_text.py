@@ -1,14 +1,16 @@
 from typing import Dict, Any
-import os
-import json
 from orchestration.states import DocumentProcessingState
+from knowledge_creation.docstore import write_document_chunks
 from chatbot.utilise.text_helper import get_text_vector_store
+from knowledge_creation.ids import assign_stable_ids
+from knowledge_creation.vector_sync import sync_vector_store
 import torch
 
 def store_text_node(state: DocumentProcessingState) -> Dict[str, Any]:
-    """Store text chunks in vector database and as local JSON"""
-    print("🔍 Storing text in vector database and local JSON...")
+    """Store text chunks in the vector database and the docstore"""
+    print("🔍 Storing text in vector database and docstore...")
     storage_status = []
+    chunk_ids = []
     
     try:
         # Initialize vector store with error handling
@@ -17,40 +19,49 @@ def store_text_node(state: DocumentProcessingState) -> Dict[str, Any]:
         except Exception as e:
             raise Exception(f"Failed to initialize vector store: {str(e)}")
 
-        # Create storage directory
-        os.makedirs("./stored_text", exist_ok=True)
         texts = []
         metadatas = []
+        chunk_ids = assign_stable_ids("text", [
+            (text_data["source_document"], text_data.get("page_number"), text_data["text"])
+            for text_data in state["processed_text"]
+        ])
 
-        for i, text_data in enumerate(state["processed_text"]):
-            # Store as JSON file
-            text_filename = f"text_chunk_{text_data['index']}_{i}.json"
-            text_path = os.path.join("./stored_text", text_filename)
-            with open(text_path, "w") as f:
-                json.dump(text_data, f, indent=2)
-            
+        # Whole document in one docstore transaction, keyed by chunk ID
+        removed = write_document_chunks(
+            state["document_path"],
+            [{**text_data, "chunk_id": chunk_id} for chunk_id, text_data in zip(chunk_ids, state["processed_text"])],
+            prune=state.get("prune_stale", True)
+        )
+
+        for chunk_id, text_data in zip(chunk_ids, state["processed_text"]):
             # Prepare for vector storage
             texts.append(text_data["text"])
             metadatas.append({
+                "chunk_id": chunk_id,
                 "index": text_data["index"],
                 "element_type": text_data["element_type"],
                 "source_document": text_data["source_document"],
+                "page_number": text_data.get("page_number") or 0,
                 "word_count": text_data["word_count"],
                 "char_count": text_data["char_count"],
-                "processed_at": text_data["processed_at"],
-                "json_path": text_path
+                "processed_at": text_data["processed_at"]
             })
 
-        # Store in vector database with device awareness
-        if texts:
-            try:
-                with torch.no_grad():  # Disable gradient calculation
-                    vector_store.add_texts(texts=texts, metadatas=metadatas)
-                storage_status.append(f"Text: Stored {len(texts)} chunks in vector database")
-            except Exception as e:
-                raise Exception(f"Failed to add texts to vector store: {str(e)}")
+        # Upsert by chunk ID so re-ingestion only embeds new chunks and drops removed ones
+        try:
+            with torch.no_grad():  # Disable gradient calculation
+                sync = sync_vector_store(
+                    vector_store, state["document_path"], chunk_ids, texts, metadatas,
+                    prune=state.get("prune_stale", True)
+                )
+            storage_status.append(
+                f"Text: Stored {len(texts)} chunks in vector database "
+                f"({sync['added']} new, {sync['unchanged']} unchanged, {sync['deleted']} removed)"
+            )
+        except Exception as e:
+            raise Exception(f"Failed to add texts to vector store: {str(e)}")
         
-        storage_status.append(f"Text: Stored {len(texts)} text chunks as JSON files")
+        storage_status.append(f"Text: Stored {len(texts)} text chunks in the docstore ({removed} removed)")
 
     except Exception as e:
         error_msg = f"Text: Error storing text - {str(e)}"
@@ -61,4 +72,7 @@ def store_text_node(state: DocumentProcessingState) -> Dict[str, Any]:
         if "Error" not in msg:
             print(f"✅ {msg}")
 
-    return {"storage_status": storage_status}
\ No newline at end of file
+    return {
+        "storage_status": storage_status,
+        "ingestion_report": [{"stage": "store_text", "ids": chunk_ids}]
+    }
\ No newline at end of file
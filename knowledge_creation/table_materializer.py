@@ -0,0 +1,130 @@
+"""Typed relational copies of extracted tables in tables.db.
+
+Each table's HTML is parsed into a header and rows and written to its own
+SQLite table, named after its table_id, so the table agent can aggregate and
+filter in SQL instead of reading HTML. Columns whose values all parse as
+numbers (after stripping thousands separators, currency and percent signs)
+become INTEGER or REAL. The table_schemas registry records each table's SQL
+name, original headers and column types.
+"""
+from typing import Dict, Any, List, Optional
+import json
+import re
+from nodes.table_nodes.table_serializer import parse_html_table
+
+# Cell values that mean "no value" in a numeric column
+NULL_MARKERS = {"", "-", "–", "—", "n/a", "na", "n.a.", "none", "null", "nan", "..."}
+
+_NUMBER = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+_CURRENCY = re.compile(r"[$€£¥₹]")
+_NON_IDENTIFIER = re.compile(r"[^a-z0-9]+")
+
+
+def ensure_schema_registry(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_schemas (
+            table_id TEXT PRIMARY KEY,
+            sql_table TEXT,
+            source_document TEXT,
+            page_number INTEGER,
+            columns TEXT,
+            row_count INTEGER,
+            description TEXT
+        )
+    ''')
+
+
+def column_names(header: List[str]) -> List[str]:
+    """SQL-safe, unique snake_case names for the header cells"""
+    names = []
+    seen = set()
+    for position, label in enumerate(header, start=1):
+        name = _NON_IDENTIFIER.sub("_", label.lower()).strip("_")[:48] or f"column_{position}"
+        if name[0].isdigit():
+            name = f"c_{name}"
+        base, suffix = name, 2
+        while name in seen or name == "row_index":
+            name = f"{base}_{suffix}"
+            suffix += 1
+        seen.add(name)
+        names.append(name)
+    return names
+
+
+def parse_number(value: str) -> Optional[float]:
+    """Numeric value of a cell such as "1,234", "$5.2", "12%" or "(300)", or None"""
+    text = _CURRENCY.sub("", value.strip()).replace(",", "").replace("−", "-").replace(" ", "")
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    text = text.rstrip("%")
+    if not _NUMBER.match(text):
+        return None
+    number = float(text)
+    return -number if negative else number
+
+
+def infer_column_type(values: List[str]) -> str:
+    present = [value for value in values if value.strip().lower() not in NULL_MARKERS]
+    if not present:
+        return "TEXT"
+    numbers = [parse_number(value) for value in present]
+    if any(number is None for number in numbers):
+        return "TEXT"
+    return "INTEGER" if all(number.is_integer() and abs(number) < 2 ** 63 for number in numbers) else "REAL"
+
+
+def coerce(value: str, column_type: str):
+    if column_type == "TEXT":
+        return value
+    if value.strip().lower() in NULL_MARKERS:
+        return None
+    number = parse_number(value)
+    return int(number) if column_type == "INTEGER" else number
+
+
+def drop_materialized(cursor, table_ids: List[str]):
+    """Drop the SQL tables and registry entries of the given table IDs"""
+    ensure_schema_registry(cursor)
+    for table_id in table_ids:
+        cursor.execute(f'DROP TABLE IF EXISTS "{table_id}"')
+    cursor.executemany("DELETE FROM table_schemas WHERE table_id = ?", [(table_id,) for table_id in table_ids])
+
+
+def materialize_table(cursor, table_id: str, table_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """(Re)create the typed SQL table for one extracted table and register its schema"""
+    parsed = parse_html_table(table_data.get("table_as_html") or "")
+    if not parsed["header"] or not parsed["rows"]:
+        return None
+
+    names = column_names(parsed["header"])
+    types = [infer_column_type([row[position] for row in parsed["rows"]]) for position in range(len(names))]
+    columns = [
+        {"name": name, "header": header, "type": column_type}
+        for name, header, column_type in zip(names, parsed["header"], types)
+    ]
+
+    cursor.execute(f'DROP TABLE IF EXISTS "{table_id}"')
+    cursor.execute(
+        f'CREATE TABLE "{table_id}" (row_index INTEGER PRIMARY KEY, '
+        + ", ".join(f'"{name}" {column_type}' for name, column_type in zip(names, types))
+        + ")"
+    )
+    cursor.executemany(
+        f'INSERT INTO "{table_id}" VALUES ({", ".join("?" * (len(names) + 1))})',
+        [
+            (row_index, *(coerce(value, column_type) for value, column_type in zip(row, types)))
+            for row_index, row in enumerate(parsed["rows"])
+        ]
+    )
+
+    ensure_schema_registry(cursor)
+    cursor.execute('''
+        INSERT OR REPLACE INTO table_schemas
+        (table_id, sql_table, source_document, page_number, columns, row_count, description)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        table_id, table_id, table_data["source_document"], table_data.get("page_number"),
+        json.dumps(columns), len(parsed["rows"]), table_data.get("description")
+    ))
+    return {"sql_table": table_id, "columns": columns, "row_count": len(parsed["rows"])}
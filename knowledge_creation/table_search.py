@@ -0,0 +1,76 @@
+"""FTS5 index over extracted tables in tables.db.
+
+table_fts holds each table's description, plain text and source document,
+keyed by table_id. store_tables_node refreshes the rows of the tables it
+writes in one batch, and pruning removes rows of deleted tables. Searches
+are ranked with BM25 and return snippets instead of the table HTML.
+"""
+from typing import Dict, Any, List
+import re
+
+# BM25 weights per column: table_id (unindexed), description, table_text, source_document
+BM25_WEIGHTS = (0.0, 2.0, 1.0, 0.5)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_table_index(cursor):
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS table_fts USING fts5(
+            table_id UNINDEXED,
+            description,
+            table_text,
+            source_document,
+            tokenize = 'porter unicode61'
+        )
+    ''')
+
+
+def remove_from_table_index(cursor, table_ids: List[str]):
+    ensure_table_index(cursor)
+    cursor.executemany("DELETE FROM table_fts WHERE table_id = ?", [(table_id,) for table_id in table_ids])
+
+
+def index_tables(cursor, entries: List[Dict[str, Any]]):
+    """Replace the index rows of the given tables (dicts with table_id, description, table_text, source_document)"""
+    remove_from_table_index(cursor, [entry["table_id"] for entry in entries])
+    cursor.executemany(
+        "INSERT INTO table_fts (table_id, description, table_text, source_document) VALUES (?, ?, ?, ?)",
+        [
+            (entry["table_id"], entry.get("description") or "", entry.get("table_text") or "", entry["source_document"])
+            for entry in entries
+        ]
+    )
+
+
+def to_match_query(query: str) -> str:
+    """Free text as an FTS5 query: every word quoted (so no syntax errors) and OR-ed for BM25"""
+    return " OR ".join(f'"{token}"' for token in _TOKEN.findall(query))
+
+
+def search_tables(cursor, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    """Best matching tables by BM25 with highlighted snippets"""
+    match = to_match_query(query)
+    if not match:
+        return []
+    ensure_table_index(cursor)
+    rows = cursor.execute(f'''
+        SELECT table_id, source_document,
+               snippet(table_fts, 1, '[', ']', '…', 16),
+               snippet(table_fts, 2, '[', ']', '…', 16),
+               bm25(table_fts, {", ".join(str(weight) for weight in BM25_WEIGHTS)}) AS score
+        FROM table_fts
+        WHERE table_fts MATCH ?
+        ORDER BY score
+        LIMIT ?
+    ''', (match, limit)).fetchall()
+    return [
+        {
+            "table_id": table_id,
+            "source_document": source_document,
+            "description_snippet": description_snippet,
+            "text_snippet": text_snippet,
+            "score": -score,
+        }
+        for table_id, source_document, description_snippet, text_snippet, score in rows
+    ]
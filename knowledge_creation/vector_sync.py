@@ -0,0 +1,52 @@
+from typing import Dict, Any, List
+
+
+def sync_vector_store(vector_store, source_document: str, ids: List[str], texts: List[str],
+                      metadatas: List[Dict[str, Any]], prune: bool = True) -> Dict[str, int]:
+    """Upsert a document's chunks by deterministic ID and drop chunks that disappeared.
+
+    IDs are content-derived, so an ID already present in the collection
+    holds exactly this text; only new IDs are embedded and added. Existing
+    IDs still get their metadata refreshed (pages, metadata blob paths, ...)
+    without re-embedding. An empty chunk list usually means parsing failed,
+    so it never prunes.
+    """
+    prune = prune and bool(ids)
+    existing = set(vector_store.get(where={"source_document": source_document}, include=[])["ids"])
+
+    new_positions = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+    if new_positions:
+        vector_store.add_texts(
+            texts=[texts[i] for i in new_positions],
+            metadatas=[metadatas[i] for i in new_positions],
+            ids=[ids[i] for i in new_positions]
+        )
+
+    unchanged_positions = [i for i, chunk_id in enumerate(ids) if chunk_id in existing]
+    if unchanged_positions:
+        # Metadata-only update: Chroma keeps the stored embeddings and documents
+        vector_store._collection.update(
+            ids=[ids[i] for i in unchanged_positions],
+            metadatas=[metadatas[i] for i in unchanged_positions]
+        )
+
+    stale = existing - set(ids) if prune else set()
+    if stale:
+        vector_store.delete(ids=list(stale))
+
+    return {
+        "added": len(new_positions),
+        "unchanged": len(unchanged_positions),
+        "deleted": len(stale),
+    }
+
+
+def prune_vector_store(vector_store, source_document: str, keep_ids: List[str]) -> int:
+    """Delete a document's chunks whose IDs are not in keep_ids (never all of them)"""
+    if not keep_ids:
+        return 0
+    existing = set(vector_store.get(where={"source_document": source_document}, include=[])["ids"])
+    stale = existing - set(keep_ids)
+    if stale:
+        vector_store.delete(ids=list(stale))
+    return len(stale)
@@ -1,7 +1,7 @@
 # model.py
 from langchain_groq import ChatGroq
-import sqlite3
 import os
+from chatbot.utilise.sql_helper import get_connection
 
 groq_api_key = os.getenv("GROQ_API_KEY")
 model_name = os.getenv("MODEL_NAME")
@@ -19,20 +19,8 @@ def initialize_models():
     
     # Initialize SQL database
     try:
-        conn = sqlite3.connect('tables.db')
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS table_metadata (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                table_id TEXT UNIQUE,
-                description TEXT,
-                html_content TEXT,
-                source_document TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        # The shared connection creates table_metadata on first open
+        get_connection()
         print("✅ SQL database initialized successfully")
     except Exception as e:
         print(f"⚠️ SQL database initialization failed: {e}")
@@ -0,0 +1,155 @@
+from typing import Dict, Any, List, Optional
+import io
+import os
+from PIL import Image
+from orchestration.states import DocumentProcessingState
+from knowledge_creation.blob_store import blob_exists, read_blob
+from knowledge_creation.image_index import find_described_image, hamming_distance, variant_refs
+from nodes.image_nodes.describe_image_node import IMAGE_PROMPT_VERSION, description_input_hash
+
+image_dedup_enabled = os.getenv("IMAGE_DEDUP", "1") != "0"
+# dHash bits two images may differ by and still count as the same picture
+image_dedup_max_distance = int(os.getenv("IMAGE_DEDUP_MAX_DISTANCE", "4"))
+
+DHASH_SIZE = 8
+# Below this edge length a perceptual hash says little, so only exact bytes match
+DHASH_MIN_EDGE = 16
+# Near matches must also have about the same shape
+MAX_ASPECT_RATIO_DIFF = 0.1
+
+
+def dhash(data) -> int:
+    """64-bit difference hash of an image's downscaled grayscale gradients"""
+    with Image.open(io.BytesIO(data)) as image:
+        small = image.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            offset = row * (DHASH_SIZE + 1) + col
+            value = (value << 1) | (pixels[offset] > pixels[offset + 1])
+    return value
+
+
+def same_shape(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    if not (a.get("width") and a.get("height") and b.get("width") and b.get("height")):
+        return False
+    ratio_a = a["width"] / a["height"]
+    ratio_b = b["width"] / b["height"]
+    return abs(ratio_a - ratio_b) <= MAX_ASPECT_RATIO_DIFF * max(ratio_a, ratio_b)
+
+
+def perceptual_hash(image_ref: Dict[str, Any]) -> Optional[int]:
+    if min(image_ref.get("width") or 0, image_ref.get("height") or 0) < DHASH_MIN_EDGE:
+        return None
+    try:
+        return dhash(read_blob(image_ref))
+    except Exception as e:
+        print(f"Could not hash image {image_ref['sha256'][:12]}: {e}")
+        return None
+
+
+def occurrence(image_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: image_data[key] for key in ("index", "page_number", "caption")}
+
+
+def unshared_bytes(image_data: Dict[str, Any], kept: Dict[str, Any]) -> int:
+    """Stored bytes of image_data's variants that the kept entry does not share (gc can reclaim them)"""
+    kept_shas = {ref["sha256"] for ref in variant_refs(kept).values()}
+    return sum(
+        ref.get("bytes", 0) for ref in variant_refs(image_data).values() if ref["sha256"] not in kept_shas
+    )
+
+
+def find_representative(image_data: Dict[str, Any], unique: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """An already kept image with the same bytes or a close enough dHash"""
+    ref = image_data["image_ref"]
+    best, best_distance = None, None
+    for candidate in unique:
+        if candidate["image_ref"]["sha256"] == ref["sha256"]:
+            return candidate
+        if image_data["dhash"] is None or candidate["dhash"] is None:
+            continue
+        distance = hamming_distance(image_data["dhash"], candidate["dhash"])
+        if distance <= image_dedup_max_distance and same_shape(ref, candidate["image_ref"]):
+            if best_distance is None or distance < best_distance:
+                best, best_distance = candidate, distance
+    return best
+
+
+def dedup_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
+    """Collapse repeated images so each distinct picture is described and stored once"""
+
+    print("🧬 Deduplicating images...")
+
+    images = state["images"]
+    unique = []
+    exact = near = reused = 0
+    # Every variant was already written by extract_images; dropped copies only
+    # become reclaimable once blob_store gc and compact run
+    bytes_reclaimable = 0
+
+    for image_data in images:
+        if not image_dedup_enabled:
+            unique.append({**image_data, "occurrences": [occurrence(image_data)]})
+            continue
+
+        image_data = {**image_data, "dhash": perceptual_hash(image_data["image_ref"])}
+        representative = find_representative(image_data, unique)
+        if representative is None:
+            unique.append({**image_data, "occurrences": [occurrence(image_data)]})
+            continue
+
+        if representative["image_ref"]["sha256"] == image_data["image_ref"]["sha256"]:
+            exact += 1
+        else:
+            near += 1
+        bytes_reclaimable += unshared_bytes(image_data, representative)
+        representative["occurrences"].append(occurrence(image_data))
+        # Keep a real caption if the first copy had none
+        if representative["caption"] == "No caption" and image_data["caption"] != "No caption":
+            representative["caption"] = image_data["caption"]
+
+    # Images described in earlier runs reuse that description and blob. The description
+    # comes from caption and image text only, so a near match must share both
+    if image_dedup_enabled:
+        for image_data in unique:
+            ref = image_data["image_ref"]
+            prompt_input = description_input_hash(image_data)
+            match = find_described_image(
+                ref["sha256"], image_data["dhash"], IMAGE_PROMPT_VERSION, image_dedup_max_distance,
+                accept=lambda entry: same_shape(ref, entry["image_ref"]) and entry["prompt_input"] == prompt_input
+            )
+            if match is None:
+                continue
+            # Swap every variant (image, thumbnail, original) or none, so they never mix;
+            # entries recorded before variant_refs existed keep this image's own blobs
+            refs = match["variant_refs"]
+            if match["sha256"] != ref["sha256"] and refs and all(blob_exists(variant) for variant in refs.values()):
+                bytes_reclaimable += unshared_bytes(image_data, refs)
+                for key in variant_refs(image_data):
+                    del image_data[key]
+                image_data.update(refs)
+            image_data["description"] = match["description"]
+            image_data["reused_from"] = match["sha256"]
+            reused += 1
+
+    print(
+        f"✅ Kept {len(unique)} of {len(images)} images "
+        f"({exact} exact and {near} near duplicates, {reused} descriptions reused)"
+    )
+
+    return {
+        "unique_images": unique,
+        "ingestion_report": [{
+            "stage": "dedup_images",
+            "images": len(images),
+            "unique_images": len(unique),
+            "exact_duplicates": exact,
+            "near_duplicates": near,
+            "descriptions_reused": reused,
+            "llm_calls_saved": exact + near + reused,
+            "bytes_reclaimable": bytes_reclaimable
+        }]
+    }
@@ -1,8 +1,67 @@
 from typing import Dict, Any
 from datetime import datetime
+import hashlib
 from orchestration.states import DocumentProcessingState
 from model import initialize_models
 from langchain.schema import HumanMessage
+from nodes.llm_runner import invoke_with_retry, map_concurrently
+from nodes.llm_cache import cached_llm_call, normalize_text
+from knowledge_creation.image_index import record_described_images
+
+# Bump whenever the prompt below changes so cached descriptions are not reused
+IMAGE_PROMPT_VERSION = "1"
+
+
+def description_input(image_data: Dict[str, Any]) -> str:
+    """What the description depends on: the prompt sees caption and image text, never the pixels"""
+    return normalize_text(f"{image_data['caption']}\n{image_data['image_text']}")
+
+
+def description_input_hash(image_data: Dict[str, Any]) -> str:
+    return hashlib.sha256(description_input(image_data).encode("utf-8")).hexdigest()
+
+
+def describe_image(model, image_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the description for a single extracted image"""
+    # Reused by the dedup stage from an image described earlier
+    if image_data.get("description"):
+        return {
+            **image_data,
+            "description_cached": False,
+            "processed_at": datetime.now().isoformat()
+        }
+    
+    try:
+        prompt = (
+            f"Describe the image in detail. The caption is: {image_data['caption']}. "
+            f"The image text is: {image_data['image_text']} "
+            f"Directly analyze the image and provide a detailed description without any additional text."
+        )
+        
+        description, cache_hit = cached_llm_call(
+            getattr(model, "model_name", ""),
+            IMAGE_PROMPT_VERSION,
+            description_input(image_data),
+            lambda: invoke_with_retry(model, [HumanMessage(content=prompt)], prompt).content
+        )
+        
+        return {
+            **image_data,
+            "description": description,
+            "description_cached": cache_hit,
+            "processed_at": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        print(f"Error processing image {image_data['index']}: {e}")
+        return {
+            **image_data,
+            "description": f"Error generating description: {str(e)}",
+            "description_cached": False,
+            "description_failed": True,
+            "processed_at": datetime.now().isoformat()
+        }
+
 
 def describe_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
     """Generate descriptions for all extracted images"""
@@ -10,32 +69,29 @@ def describe_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
     print("🔍 Generating image descriptions...")
     
     model = initialize_models()
-    processed_images = []
+    processed_images = map_concurrently(
+        lambda image_data: describe_image(model, image_data),
+        state["unique_images"]
+    )
     
-    for image_data in state["images"]:
-        try:
-            prompt = (
-                f"Describe the image in detail. The caption is: {image_data['caption']}. "
-                f"The image text is: {image_data['image_text']} "
-                f"Directly analyze the image and provide a detailed description without any additional text."
-            )
-            
-            response = model.invoke([HumanMessage(content=prompt)])
-            
-            processed_images.append({
-                **image_data,
-                "description": response.content,
-                "processed_at": datetime.now().isoformat()
-            })
-            
-        except Exception as e:
-            print(f"Error processing image {image_data['index']}: {e}")
-            processed_images.append({
-                **image_data,
-                "description": f"Error generating description: {str(e)}",
-                "processed_at": datetime.now().isoformat()
-            })
+    # New descriptions become reusable for the same image in later documents
+    record_described_images(
+        [
+            {**item, "prompt_input": description_input_hash(item)} for item in processed_images
+            if not item.get("reused_from") and not item.get("description_failed")
+        ],
+        IMAGE_PROMPT_VERSION
+    )
     
-    print(f"✅ Generated descriptions for {len(processed_images)} images")
+    reused = sum(1 for item in processed_images if item.get("reused_from"))
+    cache_hits = sum(1 for item in processed_images if item["description_cached"])
+    print(f"✅ Generated descriptions for {len(processed_images)} images ({cache_hits} from cache, {reused} reused)")
     
-    return {"processed_images": processed_images}
\ No newline at end of file
+    return {
+        "processed_images": processed_images,
+        "ingestion_report": [{
+            "stage": "describe_images",
+            "llm_cache_hits": cache_hits,
+            "llm_cache_misses": len(processed_images) - cache_hits - reused
+        }]
+    }
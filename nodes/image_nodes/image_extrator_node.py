@@ -1,5 +1,8 @@
 from typing import Dict, Any
+import base64
 from orchestration.states import DocumentProcessingState
+from knowledge_creation.blob_store import image_size, put_images
+from knowledge_creation.image_codec import encode_for_storage
 from unstructured.documents.elements import FigureCaption
 from unstructured.documents.elements import Image
 
@@ -9,6 +12,7 @@ def extract_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
     print("🖼️ Extracting images...")
     
     all_images = []
+    variants = []
     raw_chunks = state["raw_chunks"]
     
     for idx, chunk in enumerate(raw_chunks):
@@ -18,14 +22,40 @@ def extract_images_node(state: DocumentProcessingState) -> Dict[str, Any]:
             if idx + 1 < len(raw_chunks) and isinstance(raw_chunks[idx + 1], FigureCaption):
                 caption = raw_chunks[idx + 1].text
             
+            if not chunk.metadata.image_base64:
+                continue
+            
+            # raw_chunks is shared with the parallel table and text branches: read the payload, never clear it.
+            # A corrupt payload only loses this image, not the whole batch
+            try:
+                data = base64.b64decode(chunk.metadata.image_base64)
+                image_size(data)
+            except Exception as e:
+                print(f"Error reading image {idx}, skipping it: {e}")
+                continue
+            mime_type = chunk.metadata.image_mime_type or "image/png"
+            try:
+                variants.append(encode_for_storage(data, mime_type))
+            except Exception as e:
+                # put_images stores the original bytes even if only their header is usable
+                print(f"Could not re-encode image {idx}, storing it as is: {e}")
+                variants.append({"image": (data, mime_type)})
+            
             all_images.append({
                 "index": idx,
                 "caption": caption if caption else "No caption",
                 "image_text": chunk.text,
-                "base64_image": chunk.metadata.image_base64,
+                "page_number": chunk.metadata.page_number,
                 "source_document": state["document_path"]
             })
     
-    print(f"✅ Extracted {len(all_images)} images")
+    # Persist every image variant in one batch and carry only references through the pipeline
+    keys = [(position, name) for position, item in enumerate(variants) for name in item]
+    refs = put_images([variants[position][name] for position, name in keys])
+    for (position, name), ref in zip(keys, refs):
+        all_images[position][f"{name}_ref"] = ref
+    
+    stored_bytes = sum(ref["bytes"] for ref in refs)
+    print(f"✅ Extracted {len(all_images)} images ({stored_bytes / 1024:.0f} KB stored)")
     
-    return {"images": all_images}
\ No newline at end of file
+    return {"images": all_images}
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Optional
+
+llm_cache_enabled = os.getenv("LLM_CACHE", "1") != "0"
+llm_cache_path = os.getenv("LLM_CACHE_PATH", "llm_cache.db")
+llm_cache_ttl_days = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+# Run size-bound eviction every this many writes rather than on each one
+EVICT_EVERY_WRITES = 100
+
+_writes_since_evict = 0
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(llm_cache_path, timeout=30)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_responses (
+            cache_key TEXT PRIMARY KEY,
+            response TEXT,
+            created_at REAL,
+            last_used REAL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used)")
+    return conn
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def response_cache_key(model_name: str, prompt_version: str, normalized_input: str) -> str:
+    """Hash of model, prompt template version and normalized input"""
+    payload = json.dumps([model_name, prompt_version, normalized_input], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached_response(cache_key: str) -> Optional[str]:
+    """Return a cached response that is still within its TTL"""
+    now = time.time()
+    conn = _connect()
+    try:
+        row = conn.execute(
+            "SELECT response, created_at FROM llm_responses WHERE cache_key = ?",
+            (cache_key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        response, created_at = row
+        if now - created_at > llm_cache_ttl_days * 86400:
+            conn.execute("DELETE FROM llm_responses WHERE cache_key = ?", (cache_key,))
+            conn.commit()
+            return None
+
+        conn.execute("UPDATE llm_responses SET last_used = ? WHERE cache_key = ?", (now, cache_key))
+        conn.commit()
+        return response
+    finally:
+        conn.close()
+
+
+def put_cached_response(cache_key: str, response: str) -> None:
+    """Store a response and periodically evict expired and least recently used entries"""
+    global _writes_since_evict
+    now = time.time()
+    conn = _connect()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_responses (cache_key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+            (cache_key, response, now, now)
+        )
+
+        _writes_since_evict += 1
+        if _writes_since_evict >= EVICT_EVERY_WRITES:
+            _writes_since_evict = 0
+            conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ?",
+                (now - llm_cache_ttl_days * 86400,)
+            )
+            conn.execute('''
+                DELETE FROM llm_responses WHERE cache_key IN (
+                    SELECT cache_key FROM llm_responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            ''', (llm_cache_max_entries,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def cached_llm_call(model_name: str, prompt_version: str, normalized_input: str, call):
+    """Return (response_text, cache_hit), running call() only on a miss.
+
+    Failed calls raise and are never cached.
+    """
+    if not llm_cache_enabled:
+        return call(), False
+
+    cache_key = response_cache_key(model_name, prompt_version, normalized_input)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached, True
+
+    response = call()
+    put_cached_response(cache_key, response)
+    return response, False
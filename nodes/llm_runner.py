@@ -0,0 +1,124 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+# Concurrent in-flight LLM calls per describe node
+llm_concurrency = int(os.getenv("LLM_CONCURRENCY", "4"))
+# Groq account limits, shared by every describe node in the process
+groq_rpm = int(os.getenv("GROQ_RPM", "30"))
+groq_tpm = int(os.getenv("GROQ_TPM", "6000"))
+# Retries on 429 responses before the error is surfaced to the node
+llm_max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+
+# Groq counts completion tokens against TPM too, so reserve some per request
+COMPLETION_TOKEN_ESTIMATE = 500
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for rate limiting"""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously up to its capacity"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    def acquire(self, amount: float = 1.0):
+        """Block until amount tokens are available, then take them"""
+        # A single oversized request must still be able to pass once the bucket is full
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.refill_per_second
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits applied together"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+
+    def acquire(self, estimated_tokens: int):
+        self.requests.acquire(1)
+        self.tokens.acquire(estimated_tokens)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by describe_images_node and describe_tables_node"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(groq_rpm, groq_tpm)
+    return _rate_limiter
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect a 429 from the Groq client regardless of how it is wrapped"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message
+
+
+def invoke_with_retry(model, messages: List[Any], prompt_text: str):
+    """Call model.invoke under the shared rate limiter, retrying 429s with jittered backoff"""
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(prompt_text) + COMPLETION_TOKEN_ESTIMATE
+
+    for attempt in range(llm_max_retries + 1):
+        limiter.acquire(estimated_tokens)
+        try:
+            return model.invoke(messages)
+        except Exception as e:
+            if not is_rate_limit_error(e) or attempt == llm_max_retries:
+                raise
+            # Full jitter, but never retry sooner than the server asked for
+            delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+            delay = max(delay, _retry_after_seconds(e) or 0.0)
+            print(f"⏳ Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{llm_max_retries})")
+            time.sleep(delay)
+
+
+def map_concurrently(fn: Callable[[Any], Any], items: List[Any], max_workers: int = None) -> List[Any]:
+    """Apply fn to items on a bounded thread pool, returning results in input order"""
+    max_workers = max_workers or llm_concurrency
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(fn, items))
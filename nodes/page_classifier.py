@@ -0,0 +1,47 @@
+from typing import List, Tuple, Optional
+import fitz
+
+# Page labels produced by the pre-scan
+TEXT_PAGE = "text"
+LAYOUT_PAGE = "layout"
+
+# Pages with less extractable text than this are treated as scanned and need OCR
+MIN_TEXT_CHARS = 50
+# Vector drawings above this count usually mean a chart, diagram or ruled table
+MAX_TEXT_PAGE_DRAWINGS = 40
+
+
+def classify_page(page) -> str:
+    """Classify a single PyMuPDF page as text-only or needing the layout model"""
+    if page.get_images(full=False):
+        return LAYOUT_PAGE
+
+    if len(page.get_text("text").strip()) < MIN_TEXT_CHARS:
+        return LAYOUT_PAGE
+
+    if len(page.get_drawings()) > MAX_TEXT_PAGE_DRAWINGS:
+        return LAYOUT_PAGE
+
+    if page.find_tables().tables:
+        return LAYOUT_PAGE
+
+    return TEXT_PAGE
+
+
+def classify_pages(document_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """Cheap pre-scan of the PDF text layer returning one label per page in [start, end)"""
+    with fitz.open(document_path) as pdf:
+        end = pdf.page_count if end is None else end
+        return [classify_page(pdf[page_idx]) for page_idx in range(start, end)]
+
+
+def group_page_ranges(labels: List[str], first_page: int = 0) -> List[Tuple[int, int, str]]:
+    """Collapse per-page labels into consecutive (start, end, label) page ranges"""
+    ranges = []
+    for page_idx, label in enumerate(labels, start=first_page):
+        if ranges and ranges[-1][2] == label:
+            start, _, _ = ranges[-1]
+            ranges[-1] = (start, page_idx + 1, label)
+        else:
+            ranges.append((page_idx, page_idx + 1, label))
+    return ranges
@@ -0,0 +1,78 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
+import fitz
+from unstructured.partition.pdf import partition_pdf
+from unstructured.staging.base import elements_to_dicts, elements_from_dicts
+
+# A unit of parsing work: pages [start, end) partitioned with the given kwargs
+PageJob = Tuple[int, int, Dict[str, Any]]
+
+
+def count_pages(document_path: str) -> int:
+    """Return the number of pages in a PDF"""
+    with fitz.open(document_path) as pdf:
+        return pdf.page_count
+
+
+def split_page_windows(start: int, end: int, window_pages: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into consecutive (start, end) windows of at most window_pages"""
+    window_pages = max(1, window_pages)
+    return [
+        (window_start, min(window_start + window_pages, end))
+        for window_start in range(start, end, window_pages)
+    ]
+
+
+def partition_page_window(document_path: str, start: int, end: int,
+                          partition_kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Partition pages [start, end) of a PDF and return the elements as dicts.
+
+    Runs in a worker process, so elements are returned in unstructured's
+    element-dict form which pickles cheaply and round-trips losslessly.
+    """
+    fd, window_path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+
+    try:
+        with fitz.open(document_path) as pdf, fitz.open() as window:
+            window.insert_pdf(pdf, from_page=start, to_page=end - 1)
+            window.save(window_path)
+
+        elements = partition_pdf(
+            filename=window_path,
+            metadata_filename=document_path,
+            starting_page_number=start + 1,
+            chunking_strategy=None,
+            **partition_kwargs
+        )
+        return elements_to_dicts(elements)
+    finally:
+        os.remove(window_path)
+
+
+def partition_page_jobs(document_path: str, jobs: List[PageJob], max_workers: int) -> List[Any]:
+    """Partition page jobs, in a process pool if max_workers > 1, merged back in page order.
+
+    Jobs are concatenated in order, so element indices and the
+    Image -> FigureCaption adjacency used by extract_images_node behave
+    exactly as for a single partition_pdf call over the whole file.
+    """
+    if max_workers <= 1:
+        element_dicts = []
+        for start, end, partition_kwargs in jobs:
+            element_dicts.extend(partition_page_window(document_path, start, end, partition_kwargs))
+        return elements_from_dicts(element_dicts)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(partition_page_window, document_path, start, end, partition_kwargs)
+            for start, end, partition_kwargs in jobs
+        ]
+        # Collect in submission order, not completion order
+        element_dicts = []
+        for future in futures:
+            element_dicts.extend(future.result())
+
+    return elements_from_dicts(element_dicts)
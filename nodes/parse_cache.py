@@ -0,0 +1,146 @@
+"""Content-addressed on-disk cache of partition_pdf output.
+
+Entries are keyed by the SHA-256 of the PDF bytes plus the partition
+settings, and stored as gzip-compressed unstructured element JSON.
+Eviction is LRU by file mtime, which is bumped on every cache hit.
+
+Usage: python -m nodes.parse_cache {stats,list,purge} [options]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from unstructured.staging.base import elements_to_dicts, elements_from_dicts
+
+parse_cache_enabled = os.getenv("PARSE_CACHE", "1") != "0"
+parse_cache_dir = os.getenv("PARSE_CACHE_DIR", "./parse_cache")
+parse_cache_max_bytes = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+
+ENTRY_SUFFIX = ".json.gz"
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file in blocks without reading it into memory at once"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(document_path: str, settings: Dict[str, Any]) -> str:
+    """Combine the document content hash with the partition settings"""
+    settings_json = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(f"{file_sha256(document_path)}:{settings_json}".encode()).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(parse_cache_dir, key + ENTRY_SUFFIX)
+
+
+def load_partition(key: str) -> Optional[Tuple[List[Any], Dict[str, Any]]]:
+    """Return cached (elements, parse report) for a key, or None on a miss"""
+    path = _entry_path(key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+    # Mark as recently used for LRU eviction
+    os.utime(path, None)
+    return elements_from_dicts(entry["elements"]), entry["report"]
+
+
+def save_partition(key: str, elements: List[Any], report: Dict[str, Any]) -> None:
+    """Store partition output atomically, then evict down to the size limit"""
+    os.makedirs(parse_cache_dir, exist_ok=True)
+    path = _entry_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump({"report": report, "elements": elements_to_dicts(elements)}, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+    evict(parse_cache_max_bytes)
+
+
+def list_entries() -> List[Dict[str, Any]]:
+    """Cache entries, least recently used first"""
+    if not os.path.isdir(parse_cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(parse_cache_dir):
+        if not name.endswith(ENTRY_SUFFIX):
+            continue
+        stat = os.stat(os.path.join(parse_cache_dir, name))
+        entries.append({
+            "key": name[:-len(ENTRY_SUFFIX)],
+            "bytes": stat.st_size,
+            "last_used": stat.st_mtime,
+        })
+    return sorted(entries, key=lambda entry: entry["last_used"])
+
+
+def evict(max_bytes: int) -> int:
+    """Remove least recently used entries until the cache fits in max_bytes"""
+    entries = list_entries()
+    total = sum(entry["bytes"] for entry in entries)
+    removed = 0
+
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        os.remove(_entry_path(entry["key"]))
+        total -= entry["bytes"]
+        removed += 1
+    return removed
+
+
+def purge(older_than_days: Optional[float] = None) -> int:
+    """Remove all entries, or only those unused for older_than_days"""
+    cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+    removed = 0
+    for entry in list_entries():
+        if cutoff is None or entry["last_used"] < cutoff:
+            os.remove(_entry_path(entry["key"]))
+            removed += 1
+    return removed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Inspect or purge the partition cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show entry count and total size")
+    subparsers.add_parser("list", help="List entries, least recently used first")
+    purge_parser = subparsers.add_parser("purge", help="Delete cache entries")
+    purge_parser.add_argument("--older-than-days", type=float, default=None,
+                              help="Only delete entries unused for this many days")
+    purge_parser.add_argument("--max-bytes", type=int, default=None,
+                              help="Evict least recently used entries down to this size instead")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        entries = list_entries()
+        total = sum(entry["bytes"] for entry in entries)
+        print(f"📦 Parse cache: {parse_cache_dir}")
+        print(f"   Entries: {len(entries)}")
+        print(f"   Size: {total / 1024 ** 2:.1f} MB of {parse_cache_max_bytes / 1024 ** 2:.0f} MB")
+    elif args.command == "list":
+        for entry in list_entries():
+            last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_used"]))
+            print(f"{entry['key']}  {entry['bytes'] / 1024:10.1f} KB  {last_used}")
+    elif args.command == "purge":
+        if args.max_bytes is not None:
+            removed = evict(args.max_bytes)
+        else:
+            removed = purge(args.older_than_days)
+        print(f"🗑️ Removed {removed} cache entries")
+
+
+if __name__ == "__main__":
+    main()
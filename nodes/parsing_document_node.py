@@ -1,42 +1,158 @@
 from unstructured.partition.pdf import partition_pdf
-from typing import Dict, Any
+from unstructured.chunking.title import chunk_by_title
+from unstructured.__version__ import __version__ as unstructured_version
+from typing import Dict, Any, List, Tuple, Optional
+import os
 from orchestration.states import DocumentProcessingState
+from nodes.page_windows import count_pages, split_page_windows, partition_page_jobs
+from nodes.page_classifier import classify_pages, group_page_ranges, LAYOUT_PAGE
+from nodes import page_classifier
+from nodes.parse_cache import parse_cache_enabled, cache_key, load_partition, save_partition
+
+# "adaptive" pre-scans pages and only sends image/table/scanned pages through hi_res,
+# "hi_res" runs the layout model on every page
+parse_strategy = os.getenv("PARSE_STRATEGY", "adaptive")
+# Worker processes for page-parallel parsing (1 keeps parsing in-process)
+parse_workers = int(os.getenv("PARSE_WORKERS", "1"))
+# Pages handed to each worker process per partition_pdf call
+parse_window_pages = int(os.getenv("PARSE_WINDOW_PAGES", "10"))
+
+# Settings for the hi_res layout pass
+PARTITION_KWARGS = {
+    "strategy": "hi_res",
+    "infer_table_structure": True,
+    "extract_image_block_types": ["Image", "Figure", "Table"],
+    "extract_image_block_to_payload": True,
+}
+
+# Settings for pages that only need the embedded text layer
+FAST_PARTITION_KWARGS = {
+    "strategy": "fast",
+}
+
+# Settings for the by_title chunking stage run over the partitioned elements
+CHUNKING_KWARGS = {
+    "max_characters": 2000,
+    "combine_text_under_n_chars": 500,
+    "new_after_n_chars": 1500,
+}
+
+
+def partition_document(document_path: str,
+                       page_range: Optional[Tuple[int, int]] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """Partition the document (or pages [start, end) of it) once and report which path each page took"""
+    first_page, last_page = page_range or (0, count_pages(document_path))
+
+    if parse_strategy == "adaptive":
+        labels = classify_pages(document_path, first_page, last_page)
+        page_ranges = group_page_ranges(labels, first_page)
+    else:
+        page_ranges = [(first_page, last_page, LAYOUT_PAGE)]
+
+    page_count = last_page - first_page
+    hi_res_pages = sum(end - start for start, end, label in page_ranges if label == LAYOUT_PAGE)
+    report = {
+        "stage": "parse",
+        "strategy": parse_strategy,
+        "pages": page_count,
+        "hi_res_pages": hi_res_pages,
+        "fast_pages": page_count - hi_res_pages,
+    }
+
+    # Whole document through one in-process call, exactly as before
+    if page_range is None and len(page_ranges) == 1 and parse_workers <= 1:
+        kwargs = PARTITION_KWARGS if page_ranges[0][2] == LAYOUT_PAGE else FAST_PARTITION_KWARGS
+        return partition_pdf(filename=document_path, chunking_strategy=None, **kwargs), report
+
+    jobs = []
+    for start, end, label in page_ranges:
+        kwargs = PARTITION_KWARGS if label == LAYOUT_PAGE else FAST_PARTITION_KWARGS
+        window_pages = parse_window_pages if parse_workers > 1 else end - start
+        for window_start, window_end in split_page_windows(start, end, window_pages):
+            jobs.append((window_start, window_end, kwargs))
+
+    print(f"⚡ Partitioning {len(jobs)} page windows across {parse_workers} worker(s)")
+    return partition_page_jobs(document_path, jobs, parse_workers), report
+
+
+def partition_settings() -> Dict[str, Any]:
+    """Everything besides the file bytes that changes partition output (the parse cache key)"""
+    return {
+        "unstructured": unstructured_version,
+        "strategy": parse_strategy,
+        "hi_res": PARTITION_KWARGS,
+        "fast": FAST_PARTITION_KWARGS,
+        "min_text_chars": page_classifier.MIN_TEXT_CHARS,
+        "max_text_page_drawings": page_classifier.MAX_TEXT_PAGE_DRAWINGS,
+    }
+
+
+def partition_document_cached(document_path: str,
+                              page_range: Optional[Tuple[int, int]] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """partition_document behind the content-addressed parse cache"""
+    if not parse_cache_enabled:
+        return partition_document(document_path, page_range)
+
+    key = cache_key(document_path, {**partition_settings(), "page_range": page_range})
+    cached = load_partition(key)
+    if cached is not None:
+        raw_chunks, report = cached
+        print(f"♻️ Parse cache hit ({key[:12]}), skipping partition_pdf")
+        return raw_chunks, {**report, "cache": "hit"}
+
+    raw_chunks, report = partition_document(document_path, page_range)
+    try:
+        save_partition(key, raw_chunks, report)
+    except Exception as e:
+        print(f"⚠️ Could not write parse cache entry: {e}")
+    return raw_chunks, {**report, "cache": "miss"}
+
+
+def chunk_elements(raw_chunks: List[Any]) -> List[Any]:
+    """Derive by_title text chunks from already partitioned elements"""
+    return chunk_by_title(raw_chunks, **CHUNKING_KWARGS)
 
 
 def parse_document_node(state: DocumentProcessingState) -> Dict[str, Any]:
     """Parse the PDF document and extract all elements"""
-    
-    print(f"📄 Parsing document: {state['document_path']}")
-    
+
+    page_range = state.get("page_range")
+    if page_range:
+        print(f"📄 Parsing document: {state['document_path']} (pages {page_range[0] + 1}-{page_range[1]})")
+    else:
+        print(f"📄 Parsing document: {state['document_path']}")
+    ingestion_report = []
+    storage_status = []
+    processing_status = "parsed"
+
     try:
-       
-        raw_chunks = partition_pdf(
-            filename=state["document_path"],
-            strategy="hi_res",
-            infer_table_structure=True,
-            extract_image_block_types=["Image", "Figure", "Table"],
-            extract_image_block_to_payload=True,
-            chunking_strategy=None,
+        raw_chunks, parse_report = partition_document_cached(
+            state["document_path"], tuple(page_range) if page_range else None
         )
+        ingestion_report.append(parse_report)
         print(f"✅ Successfully parsed document with {len(raw_chunks)} elements")
-        
-        text_chunks = partition_pdf(
-            filename=state["document_path"],
-            strategy="hi_res",
-            chunking_strategy="by_title",
-            max_characters=2000,
-            combine_text_under_n_chars=500,
-            new_after_n_chars=1500
+        print(
+            f"   {parse_report['hi_res_pages']} page(s) via hi_res, "
+            f"{parse_report['fast_pages']} page(s) via fast text layer"
         )
+
+        # Chunk the same elements instead of running hi_res a second time
+        text_chunks = chunk_elements(raw_chunks)
         print(f"✅ Successfully chunked text into {len(text_chunks)} chunks")
-        
+
     except Exception as e:
         print(f"❌ Error during document parsing: {e}")
         raw_chunks = []
         text_chunks = []
-    
+        # Empty output from a failed parse must not look like an empty document
+        ingestion_report = [{"stage": "parse", "error": str(e)}]
+        storage_status.append(f"Parse: Error parsing document - {str(e)}")
+        processing_status = "parse_failed"
+
     return {
         "raw_chunks": raw_chunks,
         "text_chunks": text_chunks,
-        "processing_status": "parsed"
-    }
\ No newline at end of file
+        "ingestion_report": ingestion_report,
+        "storage_status": storage_status,
+        "processing_status": processing_status
+    }
@@ -3,6 +3,54 @@ from datetime import datetime
 from orchestration.states import DocumentProcessingState
 from model import initialize_models
 from langchain.schema import HumanMessage
+from nodes.llm_runner import invoke_with_retry, map_concurrently
+from nodes.llm_cache import cached_llm_call, normalize_text
+from nodes.table_nodes.table_serializer import serialize_table
+
+# Bump whenever the prompt below changes so cached descriptions are not reused
+TABLE_PROMPT_VERSION = "2"
+
+
+def describe_table(model, table_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate the description for a single extracted table"""
+    serialized = serialize_table(table_data['table_as_html'], table_data.get('table_text', ""))
+    table_data = {
+        **table_data,
+        "table_compact": serialized["text"],
+        "prompt_tokens": serialized["tokens"],
+        "source_tokens": serialized["source_tokens"]
+    }
+    try:
+        prompt = (
+            "Analyze the following table and provide a detailed description of its contents, "
+            "including the structure, key data points, and any notable trends or insights. "
+            f"Here is the table in {serialized['format']} format:\n{serialized['text']}\n"
+            "Directly analyze the table and provide a detailed description without any additional text."
+        )
+        
+        description, cache_hit = cached_llm_call(
+            getattr(model, "model_name", ""),
+            TABLE_PROMPT_VERSION,
+            normalize_text(serialized['text']),
+            lambda: invoke_with_retry(model, [HumanMessage(content=prompt)], prompt).content
+        )
+        
+        return {
+            **table_data,
+            "description": description,
+            "description_cached": cache_hit,
+            "processed_at": datetime.now().isoformat()
+        }
+        
+    except Exception as e:
+        print(f"Error processing table {table_data['index']}: {e}")
+        return {
+            **table_data,
+            "description": f"Error generating description: {str(e)}",
+            "description_cached": False,
+            "processed_at": datetime.now().isoformat()
+        }
+
 
 def describe_tables_node(state: DocumentProcessingState) -> Dict[str, Any]:
     """Generate descriptions for all extracted tables"""
@@ -10,33 +58,27 @@ def describe_tables_node(state: DocumentProcessingState) -> Dict[str, Any]:
     print("📈 Generating table descriptions...")
     
     model = initialize_models()
-    processed_tables = []
-    
-    for table_data in state["tables"]:
-        try:
-            prompt = (
-                "Analyze the following table and provide a detailed description of its contents, "
-                "including the structure, key data points, and any notable trends or insights. "
-                f"Here is the table in HTML format: {table_data['table_as_html']} "
-                "Directly analyze the table and provide a detailed description without any additional text."
-            )
-            
-            response = model.invoke([HumanMessage(content=prompt)])
-            
-            processed_tables.append({
-                **table_data,
-                "description": response.content,
-                "processed_at": datetime.now().isoformat()
-            })
-            
-        except Exception as e:
-            print(f"Error processing table {table_data['index']}: {e}")
-            processed_tables.append({
-                **table_data,
-                "description": f"Error generating description: {str(e)}",
-                "processed_at": datetime.now().isoformat()
-            })
+    processed_tables = map_concurrently(
+        lambda table_data: describe_table(model, table_data),
+        state["tables"]
+    )
     
-    print(f"✅ Generated descriptions for {len(processed_tables)} tables")
+    cache_hits = sum(1 for item in processed_tables if item["description_cached"])
+    source_tokens = sum(item["source_tokens"] for item in processed_tables)
+    prompt_tokens = sum(item["prompt_tokens"] for item in processed_tables)
+    print(
+        f"✅ Generated descriptions for {len(processed_tables)} tables ({cache_hits} from cache, "
+        f"~{source_tokens - prompt_tokens} prompt tokens saved by compact serialization)"
+    )
     
-    return {"processed_tables": processed_tables}
\ No newline at end of file
+    return {
+        "processed_tables": processed_tables,
+        "ingestion_report": [{
+            "stage": "describe_tables",
+            "llm_cache_hits": cache_hits,
+            "llm_cache_misses": len(processed_tables) - cache_hits,
+            "table_html_tokens": source_tokens,
+            "table_prompt_tokens": prompt_tokens,
+            "table_tokens_saved": source_tokens - prompt_tokens
+        }]
+    }
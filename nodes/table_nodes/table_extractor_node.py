@@ -16,6 +16,7 @@ def extract_tables_node(state: DocumentProcessingState) -> Dict[str, Any]:
                 "index": idx,
                 "table_as_html": element.metadata.text_as_html,
                 "table_text": element.text,
+                "page_number": element.metadata.page_number,
                 "source_document": state["document_path"]
             })
     
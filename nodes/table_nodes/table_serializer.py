@@ -0,0 +1,181 @@
+"""Compact serialization of parsed HTML tables for LLM prompts.
+
+text_as_html from partition_pdf spends most of its tokens on tags and
+attributes. Tables are parsed into a grid (colspan and rowspan expanded) and
+written as markdown with a header row. Tables over the token budget keep the
+header and an even sample of rows, with a note on how many were left out.
+"""
+from typing import Dict, Any, List, Optional
+from html.parser import HTMLParser
+import os
+import re
+from nodes.llm_runner import estimate_tokens
+
+table_prompt_max_tokens = int(os.getenv("TABLE_PROMPT_MAX_TOKENS", "1500"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class _TableParser(HTMLParser):
+    """Collect the cells of every <tr>, expanding colspan and rowspan"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[str]] = []
+        # Same rows with a colspan cell's text repeated in every column it covers
+        self.spanned_rows: List[List[str]] = []
+        self.header_flags: List[bool] = []
+        self._row: Optional[List[Optional[str]]] = None
+        self._spanned_row: Optional[List[str]] = None
+        self._row_is_header = False
+        self._cell: Optional[List[str]] = None
+        self._span = (1, 1)
+        # column -> (text, rows still covered) for cells spanning down
+        self._pending: Dict[int, List[Any]] = {}
+
+    def _fill_pending(self):
+        while len(self._row) in self._pending:
+            column = len(self._row)
+            text, remaining = self._pending[column]
+            self._row.append(text)
+            self._spanned_row.append(text)
+            if remaining <= 1:
+                del self._pending[column]
+            else:
+                self._pending[column][1] = remaining - 1
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self._row = []
+            self._spanned_row = []
+            self._row_is_header = False
+        elif tag in ("td", "th") and self._row is not None:
+            attrs = dict(attrs)
+            self._cell = []
+            self._span = (_span(attrs.get("colspan")), _span(attrs.get("rowspan")))
+            if tag == "th":
+                self._row_is_header = True
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(" ")
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            text = _WHITESPACE.sub(" ", "".join(self._cell)).strip()
+            colspan, rowspan = self._span
+            self._fill_pending()
+            for offset in range(colspan):
+                self._row.append(text if offset == 0 else "")
+                self._spanned_row.append(text)
+                if rowspan > 1:
+                    self._pending[len(self._row) - 1] = [text, rowspan - 1]
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self._fill_pending()
+            if any(cell for cell in self._row):
+                self.rows.append(self._row)
+                self.spanned_rows.append(self._spanned_row)
+                self.header_flags.append(self._row_is_header)
+            self._row = None
+            self._spanned_row = None
+
+
+def _span(value) -> int:
+    try:
+        return max(1, min(int(value), 100))
+    except (TypeError, ValueError):
+        return 1
+
+
+def parse_html_table(html: str) -> Dict[str, Any]:
+    """Parse table HTML into {"header": [...], "rows": [[...], ...]} with equal-width rows"""
+    parser = _TableParser()
+    parser.feed(html or "")
+    parser.close()
+    rows = parser.rows
+    if not rows:
+        return {"header": [], "rows": []}
+
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+
+    # Header rows are the leading <th> rows; without any, the first row is the header
+    header_count = 0
+    while header_count < len(rows) and parser.header_flags[header_count]:
+        header_count += 1
+    header_count = header_count or 1
+
+    if header_count == 1:
+        header = rows[0]
+    else:
+        # Stacked header rows become "Group / Column" names; a group label spanning
+        # several columns prefixes each of them
+        header_rows = [row + [""] * (width - len(row)) for row in parser.spanned_rows[:header_count]]
+        header = [
+            " / ".join(dict.fromkeys(row[column] for row in header_rows if row[column]))
+            for column in range(width)
+        ]
+    return {"header": header, "rows": rows[header_count:]}
+
+
+def _markdown_row(cells: List[str]) -> str:
+    return "| " + " | ".join(cell.replace("|", "\\|") for cell in cells) + " |"
+
+
+def to_markdown(header: List[str], rows: List[List[str]]) -> str:
+    lines = [_markdown_row(header), "|" + "---|" * len(header)]
+    lines.extend(_markdown_row(row) for row in rows)
+    return "\n".join(lines)
+
+
+def sample_rows(rows: List[List[str]], count: int) -> List[int]:
+    """Indices of `count` rows spread evenly over the table, always keeping the first and last"""
+    if count >= len(rows):
+        return list(range(len(rows)))
+    if count <= 1:
+        return [0][:count]
+    step = (len(rows) - 1) / (count - 1)
+    return sorted({round(position * step) for position in range(count)})
+
+
+def serialize_table(html: Optional[str], text: str = "", max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Compact markdown for a table plus token estimates before and after"""
+    max_tokens = max_tokens or table_prompt_max_tokens
+    source = html or text or ""
+    parsed = parse_html_table(html) if html else {"header": [], "rows": []}
+
+    if not parsed["header"]:
+        # No usable structure: fall back to the element text, cut to the budget
+        compact = _WHITESPACE.sub(" ", text or "").strip()[:max_tokens * 4]
+        return {
+            "text": compact, "format": "text", "rows": 0, "rows_included": 0,
+            "source_tokens": estimate_tokens(source), "tokens": estimate_tokens(compact)
+        }
+
+    header, rows = parsed["header"], parsed["rows"]
+    compact = to_markdown(header, rows)
+    included = len(rows)
+
+    if estimate_tokens(compact) > max_tokens and rows:
+        # Size the sample from the average row cost, then shrink until it fits
+        header_tokens = estimate_tokens(to_markdown(header, []))
+        row_tokens = max(1, (estimate_tokens(compact) - header_tokens) // len(rows))
+        count = max(2, (max_tokens - header_tokens - 20) // row_tokens)
+        while True:
+            kept = sample_rows(rows, count)
+            compact = (
+                to_markdown(header, [rows[index] for index in kept])
+                + f"\n({len(rows) - len(kept)} of {len(rows)} rows omitted; rows shown are an even sample)"
+            )
+            if estimate_tokens(compact) <= max_tokens or count <= 2:
+                break
+            count = max(2, int(count * 0.8))
+        included = len(kept)
+
+    return {
+        "text": compact, "format": "markdown", "rows": len(rows), "rows_included": included,
+        "source_tokens": estimate_tokens(source), "tokens": estimate_tokens(compact)
+    }
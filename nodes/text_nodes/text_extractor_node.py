@@ -17,6 +17,7 @@ def extract_text_node(state: DocumentProcessingState) -> Dict[str, Any]:
                 "index": idx,
                 "text": chunk.text,
                 "element_type": type(chunk).__name__,
+                "page_number": chunk.metadata.page_number,
                 "source_document": state["document_path"]
             })
     
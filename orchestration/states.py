@@ -1,16 +1,22 @@
-from typing import TypedDict, List, Dict, Any
+from typing import TypedDict, List, Dict, Any, Optional
 from typing_extensions import Annotated
 from operator import add
 
 
 class DocumentProcessingState(TypedDict):
     document_path: str
+    # [start, end) pages to process in streaming mode, None for the whole document
+    page_range: Optional[List[int]]
+    # False while streaming windows, so one window never deletes another window's chunks
+    prune_stale: bool
     raw_chunks: List[Any]
     text_chunks: List[Any]
     
     images: Annotated[List[Dict[str, Any]], add]
     tables: Annotated[List[Dict[str, Any]], add] 
     text_data: Annotated[List[Dict[str, Any]], add]
+    # Written only by dedup_images: one entry per distinct image, with every occurrence
+    unique_images: List[Dict[str, Any]]
     
   
     processed_images: Annotated[List[Dict[str, Any]], add]
@@ -20,5 +26,8 @@ class DocumentProcessingState(TypedDict):
    
     storage_status: Annotated[List[str], add]
     
+    # Per-stage metrics (one dict per entry, keyed by "stage") shown by print_summary
+    ingestion_report: Annotated[List[Dict[str, Any]], add]
+    
 
     processing_status: str
\ No newline at end of file
@@ -1,8 +1,10 @@
+import time
 from langgraph.graph import StateGraph, END
 from orchestration.states import DocumentProcessingState
 from nodes.image_nodes.image_extrator_node import extract_images_node
 from nodes.table_nodes.table_extractor_node import extract_tables_node
 from nodes.text_nodes.text_extractor_node import extract_text_node
+from nodes.image_nodes.dedup_image_node import dedup_images_node
 from nodes.image_nodes.describe_image_node import describe_images_node
 from nodes.table_nodes.describe_table_node import describe_tables_node  
 from nodes.text_nodes.describe_text_node import process_text_node
@@ -12,22 +14,33 @@ from knowledge_creation.store_table import store_tables_node
 from knowledge_creation.store_text import store_text_node
 
 
+def timed_node(name, node):
+    """Wrap a node so its wall time is appended to the ingestion report"""
+    def run(state: DocumentProcessingState):
+        start = time.perf_counter()
+        update = node(state)
+        timing = {"stage": "timing", "node": name, "seconds": time.perf_counter() - start}
+        return {**update, "ingestion_report": update.get("ingestion_report", []) + [timing]}
+    return run
+
+
 def create_document_processing_workflow():
     """Create the complete document processing workflow with parallel processing"""
     
     workflow = StateGraph(DocumentProcessingState)
     
     # Add all nodes
-    workflow.add_node("parse_document", parse_document_node)
-    workflow.add_node("extract_images", extract_images_node)
-    workflow.add_node("extract_tables", extract_tables_node)
-    workflow.add_node("extract_text", extract_text_node)
-    workflow.add_node("describe_images", describe_images_node)
-    workflow.add_node("describe_tables", describe_tables_node)
-    workflow.add_node("process_text", process_text_node)
-    workflow.add_node("store_images", store_images_node)
-    workflow.add_node("store_tables", store_tables_node)
-    workflow.add_node("store_text", store_text_node)
+    workflow.add_node("parse_document", timed_node("parse_document", parse_document_node))
+    workflow.add_node("extract_images", timed_node("extract_images", extract_images_node))
+    workflow.add_node("extract_tables", timed_node("extract_tables", extract_tables_node))
+    workflow.add_node("extract_text", timed_node("extract_text", extract_text_node))
+    workflow.add_node("dedup_images", timed_node("dedup_images", dedup_images_node))
+    workflow.add_node("describe_images", timed_node("describe_images", describe_images_node))
+    workflow.add_node("describe_tables", timed_node("describe_tables", describe_tables_node))
+    workflow.add_node("process_text", timed_node("process_text", process_text_node))
+    workflow.add_node("store_images", timed_node("store_images", store_images_node))
+    workflow.add_node("store_tables", timed_node("store_tables", store_tables_node))
+    workflow.add_node("store_text", timed_node("store_text", store_text_node))
     
     # Define the workflow exactly as you specified
     workflow.set_entry_point("parse_document")
@@ -38,7 +51,8 @@ def create_document_processing_workflow():
     workflow.add_edge("parse_document", "extract_text")
     
     # Description nodes
-    workflow.add_edge("extract_images", "describe_images")
+    workflow.add_edge("extract_images", "dedup_images")
+    workflow.add_edge("dedup_images", "describe_images")
     workflow.add_edge("extract_tables", "describe_tables")
     workflow.add_edge("extract_text", "process_text")
     
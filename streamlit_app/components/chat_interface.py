@@ -65,6 +65,8 @@ def display_agent_metadata(message: Dict[str, Any]):
     agent_workflow = ' → '.join([call['agent'] for call in message['agent_calls']])
     total_tokens = message.get("total_tokens", 0)
     responding_agent = message.get("responding_agent", "Unknown")
+    if message.get("cached"):
+        responding_agent = f"{responding_agent} (cached answer)"
     
     st.markdown(f"""
     <div style="background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
@@ -118,7 +120,8 @@ def process_user_input(agent, prompt: str):
         "content": response["content"],
         "agent_calls": response.get("agent_calls", []),
         "total_tokens": response.get("total_tokens", 0),
-        "responding_agent": response.get("responding_agent", None)
+        "responding_agent": response.get("responding_agent", None),
+        "cached": response.get("cached", False)
     })
     
     # Clear input and rerun to show new messages
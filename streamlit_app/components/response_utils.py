@@ -172,9 +172,51 @@ def format_response(content: str) -> str:
     
     return '\n\n'.join(formatted_paragraphs)
 
+def lookup_cached_answer(prompt: str):
+    """(cached response or None, cache key for storing the fresh answer); never raises"""
+    from chatbot.utilise.answer_cache import answer_cache_enabled, get_answer_cache
+    if not answer_cache_enabled:
+        return None, None
+    cache = get_answer_cache()
+    try:
+        cached, key = cache.lookup(prompt)
+    except Exception as e:
+        cache.record_error()
+        logger.warning(f"Answer cache lookup failed: {str(e)}")
+        return None, None
+    if cached is None:
+        return None, key
+    logger.debug(f"Answer cache hit ({cached['similarity']:.3f}) for: {cached['cached_question']}")
+    return {
+        "success": True,
+        "content": cached["content"],
+        "agent_calls": cached["agent_calls"] or [],
+        # Nothing was spent on this answer
+        "total_tokens": 0,
+        "responding_agent": cached["responding_agent"],
+        "cached": True,
+        "raw_response": None
+    }, None
+
+def store_cached_answer(key, response: Dict[str, Any]):
+    """Remember a successful answer; failures only cost the cache entry"""
+    if key is None:
+        return
+    from chatbot.utilise.answer_cache import get_answer_cache
+    cache = get_answer_cache()
+    try:
+        cache.store(key, response)
+    except Exception as e:
+        cache.record_error()
+        logger.warning(f"Answer cache store failed: {str(e)}")
+
 def get_response(agent, prompt: str) -> Dict[str, Any]:
     """Get response from chatbot with enhanced debugging and formatting"""
     try:
+        cached, cache_key = lookup_cached_answer(prompt)
+        if cached is not None:
+            return cached
+
         logger.debug(f"Invoking agent with prompt: {prompt}")
         
         # Prepare the input message structure
@@ -197,14 +239,18 @@ def get_response(agent, prompt: str) -> Dict[str, Any]:
         response_data = extract_response_with_metadata(response_dict)
         formatted_content = format_response(response_data['content'])
         
-        return {
+        result = {
             "success": True,
             "content": formatted_content,
             "agent_calls": response_data['agent_calls'],
             "total_tokens": response_data['total_tokens'],
             "responding_agent": response_data['responding_agent'],
+            "cached": False,
             "raw_response": response
         }
+        if response_data['content'] != "No meaningful response found":
+            store_cached_answer(cache_key, result)
+        return result
         
     except Exception as e:
         logger.error(f"Error in get_response: {str(e)}", exc_info=True)
@@ -1,5 +1,5 @@
 import streamlit as st
-import sqlite3
+from chatbot.utilise.sql_helper import get_connection
 from chatbot.utilise.text_helper import get_text_retriever
 from chatbot.utilise.image_helper import get_image_retriever
 
@@ -21,6 +21,7 @@ def show_system_status():
     check_text_retrieval()
     check_image_retrieval()
     check_table_database()
+    check_answer_cache()
 
 def check_text_retrieval():
     """Check text retrieval system status"""
@@ -63,11 +64,7 @@ def check_image_retrieval():
 def check_table_database():
     """Check table database status"""
     try:
-        conn = sqlite3.connect('tables.db')
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM table_metadata")
-        count = cursor.fetchone()[0]
-        conn.close()
+        count = get_connection().execute("SELECT COUNT(*) FROM table_metadata").fetchone()[0]
         show_status_item(
             "Table Database",
             "✅ Online",
@@ -82,6 +79,21 @@ def check_table_database():
             "#dc3545"
         )
 
+def check_answer_cache():
+    """Show how many questions the answer cache has served"""
+    from chatbot.utilise.answer_cache import answer_cache_enabled, get_answer_cache
+    if not answer_cache_enabled:
+        show_status_item("Answer Cache", "⏸️ Disabled", "Set ANSWER_CACHE=1 to enable", "#6c757d")
+        return
+    stats = get_answer_cache().stats()
+    show_status_item(
+        "Answer Cache",
+        "✅ Online",
+        f"Hit rate: {stats['hit_rate'] * 100:.0f}% of {stats['lookups']} questions · "
+        f"Entries: {stats['entries']} · Tokens saved: {stats['tokens_saved']}",
+        "#28a745"
+    )
+
 def show_status_item(name: str, status: str, details: str, color: str):
     """Display a status item with consistent styling"""
     st.markdown(f"""
@@ -1,25 +1,45 @@
+import gc
+import os
+import resource
 from orchestration.workflows import create_document_processing_workflow
+from chatbot.utilise.embedding_helper import get_embeddings
+from nodes.page_windows import count_pages, split_page_windows
+from knowledge_creation.vector_sync import prune_vector_store
+from knowledge_creation.store_table import prune_tables
+from knowledge_creation.docstore import mark_ingested, prune_chunks
 
-def process_document(document_path: str):
-    """Process a document through the complete pipeline"""
-    
-    # Create workflow
-    workflow = create_document_processing_workflow()
-    
-    # Initial state
-    initial_state = {
+# Pages per window in streaming mode
+stream_window_pages = int(os.getenv("STREAM_WINDOW_PAGES", "20"))
+
+def create_initial_state(document_path: str):
+    """Empty pipeline state for a document"""
+    return {
         "document_path": document_path,
+        "page_range": None,
+        "prune_stale": True,
         "raw_chunks": [],
         "text_chunks": [],
         "images": [],
+        "unique_images": [],
         "tables": [],
         "text_data": [],
         "processed_images": [],
         "processed_tables": [],
         "processed_text": [],
         "storage_status": [],
+        "ingestion_report": [],
         "processing_status": "initialized"
     }
+
+
+def process_document(document_path: str):
+    """Process a document through the complete pipeline"""
+    
+    # Create workflow
+    workflow = create_document_processing_workflow()
+    
+    # Initial state
+    initial_state = create_initial_state(document_path)
     
     # Run the workflow
     print("🚀 Starting document processing pipeline...")
@@ -34,6 +54,111 @@ def process_document(document_path: str):
         return None
 
 
+def merge_reports(reports):
+    """Sum per-window report entries that share a stage (and node, for timings)"""
+    merged = {}
+    for report in reports:
+        key = (report.get("stage"), report.get("node"))
+        if key not in merged:
+            merged[key] = dict(report)
+            continue
+        for field, value in report.items():
+            current = merged[key].get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key][field] = (current or 0) + value
+            elif current != value:
+                merged[key][field] = "mixed"
+    return list(merged.values())
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def process_document_streaming(document_path: str, window_pages: int = None):
+    """Process a document window by window so memory stays flat as page count grows.
+
+    Each page window runs the full graph (parse, extract, describe, store) and
+    is dropped once persisted; only counts and stored IDs are kept. Stale
+    chunks are pruned once at the end against the IDs of every window. An
+    image whose caption starts the next window is stored without the caption.
+    """
+    window_pages = window_pages or stream_window_pages
+    workflow = create_document_processing_workflow()
+    windows = split_page_windows(0, count_pages(document_path), window_pages)
+    
+    counts = {"images": 0, "tables": 0, "text": 0}
+    storage_status = []
+    reports = []
+    kept_ids = {"store_text": [], "store_images": [], "store_tables": []}
+    failed_windows = 0
+    
+    print(f"🚀 Streaming {document_path} in {len(windows)} windows of {window_pages} pages...")
+    for start, end in windows:
+        state = create_initial_state(document_path)
+        state["page_range"] = [start, end]
+        state["prune_stale"] = False
+        try:
+            result = workflow.invoke(state)
+        except Exception as e:
+            print(f"❌ Window {start + 1}-{end} failed: {e}")
+            failed_windows += 1
+            continue
+        
+        counts["images"] += len(result.get("processed_images", []))
+        counts["tables"] += len(result.get("processed_tables", []))
+        counts["text"] += len(result.get("processed_text", []))
+        storage_status.extend(result.get("storage_status", []))
+        parse_reports = [r for r in result.get("ingestion_report", []) if r.get("stage") == "parse"]
+        parse_failed = (
+            result.get("processing_status") == "parse_failed"
+            or not parse_reports
+            or any("error" in report for report in parse_reports)
+        )
+        if parse_failed:
+            print(f"❌ Pages {start + 1}-{end} could not be parsed")
+        if parse_failed or any("error" in status.lower() for status in result.get("storage_status", [])):
+            failed_windows += 1
+        for report in result.get("ingestion_report", []):
+            if report.get("stage") in kept_ids:
+                kept_ids[report["stage"]].extend(report["ids"])
+            else:
+                reports.append(report)
+        
+        # Release the window's elements and payloads before the next one
+        del result, state
+        gc.collect()
+        print(f"✅ Pages {start + 1}-{end} stored (peak RSS {peak_rss_mb():.0f} MB)")
+    
+    # Pruning after a failed window would delete chunks that simply were not re-stored
+    if failed_windows:
+        print(f"⚠️ {failed_windows} window(s) failed, skipping removal of stale chunks")
+    else:
+        from chatbot.utilise.text_helper import get_text_vector_store
+        from chatbot.utilise.image_helper import get_image_vector_store
+        from chatbot.utilise.sql_helper import transaction
+        
+        removed = prune_vector_store(get_text_vector_store(), document_path, kept_ids["store_text"])
+        removed += prune_chunks(document_path, kept_ids["store_text"])
+        removed += prune_vector_store(get_image_vector_store(), document_path, kept_ids["store_images"])
+        with transaction() as cursor:
+            removed += prune_tables(cursor, document_path, kept_ids["store_tables"])
+        if removed:
+            mark_ingested(document_path)
+            print(f"🗑️ Removed {removed} stale entries from earlier versions of the document")
+    
+    print("\n✨ Document processing completed!")
+    return {
+        "processing_status": "streamed" if not failed_windows else "streamed_with_errors",
+        "processed_counts": counts,
+        "storage_status": storage_status,
+        "ingestion_report": merge_reports(reports),
+        "windows": len(windows),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
 def print_summary(result):
     """Print a nice summary of the processing results"""
     if not result:
@@ -42,14 +167,64 @@ def print_summary(result):
     print(f"\n🎉 Final Status: {result['processing_status']}")
     
     
-    total_images = len(result.get('processed_images', []))
-    total_tables = len(result.get('processed_tables', []))
-    total_text = len(result.get('processed_text', []))
+    # Streaming results only carry counts
+    counts = result.get('processed_counts', {})
+    total_images = counts.get('images', len(result.get('processed_images', [])))
+    total_tables = counts.get('tables', len(result.get('processed_tables', [])))
+    total_text = counts.get('text', len(result.get('processed_text', [])))
     
     print(f"\n📊 Processing Summary:")
     print(f"   🖼️  Images processed: {total_images}")
     print(f"   📊 Tables processed: {total_tables}")
     print(f"   📝 Text chunks processed: {total_text}")
+    if 'windows' in result:
+        print(f"   🪟 Page windows: {result['windows']} (peak RSS {result['peak_rss_mb']:.0f} MB)")
+    
+    
+    for report in result.get('ingestion_report', []):
+        if report.get('stage') == 'parse' and report.get('pages'):
+            skipped = report['fast_pages'] / report['pages'] * 100
+            print(f"\n📄 Parsing ({report['strategy']}, cache {report.get('cache', 'off')}):")
+            print(f"   🔬 hi_res pages: {report['hi_res_pages']}")
+            print(f"   ⚡ Fast text-layer pages: {report['fast_pages']} ({skipped:.0f}% skipped the layout model)")
+    
+    
+    for report in result.get('ingestion_report', []):
+        if report.get('stage') == 'dedup_images' and report.get('images'):
+            print(f"\n🧬 Image Dedup:")
+            print(f"   Kept {report['unique_images']} of {report['images']} images "
+                  f"({report['exact_duplicates']} exact, {report['near_duplicates']} near duplicates)")
+            print(f"   Descriptions reused from the corpus: {report['descriptions_reused']}")
+            print(f"   LLM calls saved: {report['llm_calls_saved']}")
+            print(f"   Duplicate blobs reclaimable by blob_store gc + compact: {report['bytes_reclaimable'] / 1024:.0f} KB")
+    
+    
+    cache_reports = [r for r in result.get('ingestion_report', []) if 'llm_cache_hits' in r]
+    if cache_reports:
+        print(f"\n🧠 LLM Description Cache:")
+        for report in cache_reports:
+            print(f"   {report['stage']}: {report['llm_cache_hits']} hits, {report['llm_cache_misses']} misses")
+            if report.get('table_html_tokens'):
+                print(f"   Table prompts: ~{report['table_prompt_tokens']} tokens instead of "
+                      f"~{report['table_html_tokens']} as HTML ({report['table_tokens_saved']} saved)")
+    
+    
+    timings = [r for r in result.get('ingestion_report', []) if r.get('stage') == 'timing']
+    if timings:
+        print(f"\n⏱️ Stage Timings:")
+        for timing in timings:
+            print(f"   {timing['node']}: {timing['seconds']:.1f}s")
+    
+    
+    embedding_stats = get_embeddings().stats()
+    # A fully cached re-ingest never loads the model, but the cache line matters most then
+    if embedding_stats["loaded"] or embedding_stats["cache_hits"] or embedding_stats["cache_misses"]:
+        device = f" ({embedding_stats['device']})" if embedding_stats["loaded"] else " (model not loaded)"
+        print(f"\n🔢 Embeddings{device}:")
+        if embedding_stats["loaded"]:
+            print(f"   Model load: {embedding_stats['load_seconds']:.1f}s")
+            print(f"   Encoded {embedding_stats['texts_encoded']} texts at {embedding_stats['texts_per_second']:.0f} texts/s")
+        print(f"   Embedding cache: {embedding_stats['cache_hits']} hits, {embedding_stats['cache_misses']} encoded")
     
     
     if result.get('storage_status'):